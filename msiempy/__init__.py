@@ -28,6 +28,7 @@ from .event import (
     FieldFilter,
     GroupedEventManager,
     GroupedEvent,
+    EventTable,
 )
 from .watchlist import Watchlist, WatchlistManager
 from .__version__ import __version__ as VERSION
@@ -36,4 +37,4 @@ from .__version__ import __version__ as VERSION
 __all__=[       "NitroConfig", "NitroError", "NitroSession", 
                 "Alarm", "AlarmManager", "ESM", "DevTree", "DataSource", 
                 "Event", "EventManager", "FieldFilter", "GroupFilter",
-                "GroupedEvent", "GroupedEventManager", "Watchlist", "WatchlistManager" ]
\ No newline at end of file
+                "GroupedEvent", "GroupedEventManager", "EventTable", "Watchlist", "WatchlistManager" ]
\ No newline at end of file
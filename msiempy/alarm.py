@@ -1,5 +1,6 @@
 """Provide alarm management. Define `AlarmManager` and `Alarm`. 
 """
+import json
 import collections
 import logging
 
@@ -38,10 +39,9 @@ class AlarmManager(FilteredQueryList):
                 print(alarms)
                 print(alarms.get_text(
                         fields=['id','triggeredDate','acknowledgedDate', 'alarmName', 'acknowledgedUsername']))
-                # Acknowledge alarms
+                # Acknowledge alarms, by chunks of 100 alarms per request
                 print("Acknowledge alarms")
-                for alarm in alarms:
-                        alarm.acknowledge()
+                failed = alarms.acknowledge()
 
 
     Notes: 
@@ -265,6 +265,92 @@ class AlarmManager(FilteredQueryList):
         self.data = alarms
         return self
 
+    ALARMS_CHUNK_SIZE = 100
+    """Default number of alarms IDs per request of `acknowledge`, `unacknowledge` and `delete`"""
+
+    def acknowledge(self, chunk_size=None, workers=5):
+        """
+        Mark all the alarms of the list as acknowledged. The alarms IDs are sent by chunks, chunks are sent concurrently.
+
+        Arguments:
+            - `chunk_size` (`int`): Number of alarms IDs per request. Default to `ALARMS_CHUNK_SIZE`.
+            - `workers` (`int`): Number of concurrent requests.
+
+        Returns:
+            `list[tuple(list, Exception)]`: The IDs and errors of the chunks that failed.
+        """
+        return self._alarms_request("ack_alarms", chunk_size, workers)
+
+    def unacknowledge(self, chunk_size=None, workers=5):
+        """
+        Mark all the alarms of the list as unacknowledged. See `acknowledge`.
+        """
+        return self._alarms_request("unack_alarms", chunk_size, workers)
+
+    def delete(self, chunk_size=None, workers=5):
+        """
+        Delete all the alarms of the list. See `acknowledge`.
+
+        Warning:
+            Destructive action
+        """
+        return self._alarms_request("delete_alarms", chunk_size, workers)
+
+    def _alarms_request(self, request, chunk_size=None, workers=5):
+        """
+        Send the alarms IDs by chunks to an alarm operation endpoint, in the API v1 or v2 form. Returns the failed chunks.
+        """
+        ids = [alarm.data["id"]["value"] for alarm in self]
+        if not ids:
+            return []
+        chunk_size = chunk_size or self.ALARMS_CHUNK_SIZE
+        chunks = [ids[i : i + chunk_size] for i in range(0, len(ids), chunk_size)]
+
+        # The API version is known after login
+        if not self.nitro.logged_in:
+            self.nitro.login()
+        api_v = self.nitro.api_v
+        method = self.nitro.PARAMS[request if api_v == 1 else request + "_11_2_1"][0]
+
+        # The payloads are encoded once, retries send them as is
+        payloads = [json.dumps(Alarm._alarms_data(chunk, api_v)) for chunk in chunks]
+
+        results = self.perform(
+            lambda payload: self.nitro.api_request(method, payload),
+            payloads,
+            asynch=True,
+            workers=workers,
+            return_exceptions=True,
+            message="Sending {} alarms to {} in {} requests...".format(
+                len(ids), method, len(chunks)
+            ),
+        )
+        failed = [
+            (chunk, result)
+            for chunk, result in zip(chunks, results)
+            if isinstance(result, Exception)
+        ]
+        for chunk, error in failed:
+            log.error(
+                "{} failed for {} alarms ({}...): {}".format(
+                    method, len(chunk), chunk[:3], error
+                )
+            )
+        return failed
+
+    def _load_alarm(
+        self, alarm, events_details=True, use_query=False, extra_fields=[], workers=10
+    ):
+        """
+        Load the alarm details and, if the alarm is matching the filters, its events details.
+        """
+        alarm.load_details()
+        if events_details and self._alarm_match(alarm):
+            alarm.load_events(
+                use_query=use_query, extra_fields=extra_fields, workers=workers
+            )
+        return alarm
+
     def _qry_load_data(
         self,
         workers=10,
@@ -320,9 +406,24 @@ class AlarmManager(FilteredQueryList):
 
         if alarms_details:
 
-            log.info("Getting alarms infos...")
+            log.info(
+                "Getting alarms infos{}...".format(
+                    " and full events infos" if events_details else ""
+                )
+            )
+            # Alarms details and events details are loaded in the same tasks: the events of an alarm are loaded as soon as its details are.
+            # The events details tasks are nested and share the same workers.
             alarm_based_filtered.perform(
-                Alarm.load_details, asynch=True, progress=True, workers=workers
+                self._load_alarm,
+                func_args=dict(
+                    events_details=events_details,
+                    use_query=use_query,
+                    extra_fields=extra_fields,
+                    workers=workers,
+                ),
+                asynch=True,
+                progress=True,
+                workers=workers,
             )
 
             # Casting to list of Alarms to be able to call load_details etc...
@@ -330,16 +431,6 @@ class AlarmManager(FilteredQueryList):
                 [a for a in alarm_based_filtered if self._alarm_match(a)]
             )
 
-            if events_details:
-                log.info("Getting full events infos...")
-                detailed_alarm_based_filtered.perform(
-                    Alarm.load_events,
-                    func_args=dict(use_query=use_query, extra_fields=extra_fields),
-                    asynch=True,
-                    progress=True,
-                    workers=workers,
-                )
-
             filtered_alarms = AlarmManager(
                 [a for a in detailed_alarm_based_filtered if self._event_match(a)]
             )
@@ -478,6 +569,15 @@ class Alarm(NitroDict):
     ]
     """Just a list of regular fields."""
 
+    @staticmethod
+    def _alarms_data(ids, api_v=2):
+        """
+        Returns the data of the alarm operations requests with a list of triggered alarms IDs, API v1 or v2 form.
+        """
+        if api_v == 1:
+            return {"triggeredIds": [{"value": the_id} for the_id in ids]}
+        return {"triggeredIds": {"alarmIdList": list(ids)}}
+
     def acknowledge(self):
         """Mark the alarm as acknowledged."""
         if self.nitro.api_v == 1:
@@ -551,14 +651,25 @@ class Alarm(NitroDict):
             # set it as the only item of the event list
             self.data["events"] = [the_first_event]
 
-        elif isinstance(self.data["events"], (EventManager)):
-            # The list has been loaded from notifyGetTriggeredNotificationDetail
-            self.data["events"].perform(
-                Event.refresh,
-                asynch=True,
+        elif isinstance(self.data["events"], (EventManager)) and use_query:
+            # Load all the events in a few queries, narrowed around the triggered date
+            events = self.data["events"]
+            ids = [event.get_id() for event in events]
+            loaded = EventManager.from_ids(
+                ids,
+                fields=extra_fields,
+                hints=dict.fromkeys(ids, self.data.get("triggeredDate")),
                 workers=workers,
-                func_args=dict(use_query=use_query, extra_fields=extra_fields),
             )
+            loaded = {event["IPSIDAlertID"]: event for event in loaded}
+            for the_id, event in zip(ids, events):
+                if the_id in loaded:
+                    event.data.update(loaded[the_id].data)
+
+        elif isinstance(self.data["events"], (EventManager)):
+            # The list has been loaded from notifyGetTriggeredNotificationDetail
+            # Details are deduplicated and cached across alarms
+            self.data["events"].load_details(workers=workers)
         else:
             log.info(
                 "The alarm {} ({}) has no events associated".format(
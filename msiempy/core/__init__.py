@@ -8,6 +8,12 @@ Base objects:
     - `NitroList`  
     - `FilteredQueryList`  
 
+Other objects:
+    - `QueryCache`  
+    - `DetailCache`  
+    - `SpillStore`  
+    - `SpilledList`  
+
 """
 
 
@@ -15,3 +21,5 @@ from .types import NitroList, NitroDict, NitroObject
 from .query import FilteredQueryList
 from .session import NitroSession, NitroError
 from .config import NitroConfig
+from .cache import QueryCache, DetailCache
+from .spill import SpillStore, SpilledList
@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+Local caches of query results and event details. Define `QueryCache` and `DetailCache`.
+"""
+
+import os
+import time
+import json
+import gzip
+import sqlite3
+import collections
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from .utils import parse_timedelta
+from .config import NitroConfig
+
+log = logging.getLogger("msiempy")
+
+
+class QueryCache:
+    """
+    Segment-based on-disk cache of closed-window query results.
+
+    Results are stored per query fingerprint (fields, filters and order) and per aligned time segment (hourly by default) as gzipped JSON files.
+    When a query window overlaps cached segments, only the missing segments need to be requested to the SIEM.
+
+    Only closed segments are cached: a segment is closed if it ended before ``now - closed_after``. Open segments, that are still receiving events, are never stored.
+    The total size of the cache is bounded by `max_size`, the least recently used segments are evicted first.
+
+    Exemple:
+
+    >>> from msiempy import EventManager
+    >>> from msiempy.core import QueryCache
+    >>> events = EventManager(time_range='LAST_3_DAYS', fields=['SrcIP', 'DstIP'])
+    >>> events.load_data(cache=QueryCache(segment='1h'), max_query_depth=1)
+    """
+
+    def __init__(self, path=None, segment="1h", max_size=500 * 1024 * 1024, closed_after="10m"):
+        """
+        Create or open a query cache.
+
+        Arguments:
+            - `path` (`str`): Cache directory. Default to ``cache`` folder in the configuration directory: `.msiem/cache`.
+            - `segment` (`str` or `timedelta`): Time segment duration. Exemple: ``"1h"``, ``"1d"``.
+            - `max_size` (`int`): Maximum size of the cache in bytes.
+            - `closed_after` (`str` or `timedelta`): Delay after which a time segment is considered closed (covers the ingestion lag of the SIEM).
+        """
+        if not path:
+            path = os.path.join(os.path.dirname(NitroConfig.find_ini_location()), "cache")
+        self.path = path
+        """Cache directory"""
+
+        self.segment = segment if isinstance(segment, timedelta) else parse_timedelta(segment)
+        """Time segment duration `timedelta`"""
+
+        self.max_size = int(max_size)
+        """Maximum size of the cache in bytes"""
+
+        self.closed_after = (
+            closed_after
+            if isinstance(closed_after, timedelta)
+            else parse_timedelta(closed_after)
+        )
+        """Delay after which a time segment is considered closed"""
+
+        self.stats = {"hits": 0, "misses": 0}
+        """Cache hits and misses counters"""
+
+        self._lock = threading.Lock()
+
+    EPOCH = datetime(1970, 1, 1)
+    """Time segments are aligned on the epoch"""
+
+    @staticmethod
+    def fingerprint(fields, filters, order):
+        """
+        Returns the canonical fingerprint of a query.
+
+        Arguments:
+            - `fields` (`list[str]`): Query fields, the order doesn't matter.
+            - `filters` (`list[dict]`): Query filters, SIEM formatted.
+            - `order` (`tuple`): Query order.
+        """
+        canonical = json.dumps(
+            {"fields": sorted(fields), "filters": filters, "order": list(order)},
+            sort_keys=True,
+        )
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+    def divide(self, start, end):
+        """
+        Divide a time window in segments aligned on the cache segment duration.
+
+        Arguments:
+            - `start` (`datetime`): Window start
+            - `end` (`datetime`): Window end
+
+        Returns:
+            `list[tuple(datetime, datetime, bool)]`: Segments start, end and weither the segment can be cached.
+            Segments at the edges of the window might be partial, those are not cacheable.
+        """
+        seconds = self.segment.total_seconds()
+        aligned = self.EPOCH + timedelta(
+            seconds=((start - self.EPOCH).total_seconds() // seconds) * seconds
+        )
+        closed_before = datetime.now() - self.closed_after
+        segments = list()
+        while aligned < end:
+            seg_end = aligned + self.segment
+            seg = (max(aligned, start), min(seg_end, end))
+            cacheable = (
+                seg[0] == aligned and seg[1] == seg_end and seg_end <= closed_before
+            )
+            segments.append((seg[0], seg[1], cacheable))
+            aligned = seg_end
+        return segments
+
+    def _file(self, fingerprint, seg_start):
+        return os.path.join(
+            self.path,
+            fingerprint,
+            "{}-{}.json.gz".format(
+                int((seg_start - self.EPOCH).total_seconds()),
+                int(self.segment.total_seconds()),
+            ),
+        )
+
+    def get(self, fingerprint, seg_start):
+        """
+        Returns the cached rows of a segment as `list[dict]` or `None` if the segment is not cached.
+        """
+        path = self._file(fingerprint, seg_start)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                segment = json.load(f)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        # Touch the file for the LRU eviction
+        os.utime(path)
+        self.stats["hits"] += 1
+        columns = segment["columns"]
+        return [dict(zip(columns, row)) for row in segment["rows"]]
+
+    def put(self, fingerprint, seg_start, seg_end, rows):
+        """
+        Store the rows of a closed segment. Open segments are ignored.
+
+        Arguments:
+            - `fingerprint` (`str`): Query fingerprint, see `fingerprint`.
+            - `seg_start` (`datetime`): Segment start.
+            - `seg_end` (`datetime`): Segment end.
+            - `rows` (`list[dict]`): Rows of the segment.
+        """
+        if seg_end > datetime.now() - self.closed_after:
+            log.debug("Not caching open segment {} - {}".format(seg_start, seg_end))
+            return
+        columns = sorted(set(key for row in rows for key in row))
+        segment = {
+            "columns": columns,
+            "rows": [[row.get(c) for c in columns] for row in rows],
+        }
+        path = self._file(fingerprint, seg_start)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file then rename so concurrent readers never see partial segments
+        tmp = path + ".{}.tmp".format(threading.get_ident())
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(segment, f, separators=(",", ":"))
+        os.replace(tmp, path)
+        self.evict()
+
+    def size(self):
+        """Returns the size of the cache in bytes."""
+        return sum(os.path.getsize(f) for f, _ in self._files())
+
+    def _files(self):
+        for root, _, files in os.walk(self.path):
+            for name in files:
+                path = os.path.join(root, name)
+                yield (path, os.path.getmtime(path))
+
+    def evict(self):
+        """
+        Remove the least recently used segments until the cache size is under `max_size`.
+        """
+        with self._lock:
+            files = sorted(self._files(), key=lambda f: f[1])
+            total = sum(os.path.getsize(f) for f, _ in files)
+            for path, _ in files:
+                if total <= self.max_size:
+                    break
+                total -= os.path.getsize(path)
+                os.remove(path)
+                log.debug("Evicted cached segment {}".format(path))
+
+    def clear(self, fingerprint=None):
+        """
+        Remove all cached segments, or only the segments of a query fingerprint.
+        """
+        path = os.path.join(self.path, fingerprint) if fingerprint else self.path
+        for root, _, files in os.walk(path):
+            for name in files:
+                os.remove(os.path.join(root, name))
+
+
+class DetailCache:
+    """
+    Size and TTL bounded LRU cache of event details, keyed by event ID (``IPSIDAlertID``). 
+    Caching the details avoids repeated ``ipsGetAlertData`` round trips across alarms and, with a `path`, across runs. 
+    The details include the event notes: `msiempy.event.Event.set_note` and `msiempy.event.EventManager.set_notes` drop the modified events from the default cache 
+    `msiempy.event.EventManager.DETAILS_CACHE`, call `pop` to drop them from other caches.
+
+    Entries are kept in memory and optionally in a SQLite database on disk. Both are bounded by `max_size` entries, the least recently used are evicted first.
+
+    Exemple:
+
+    >>> from msiempy import EventManager
+    >>> from msiempy.core import DetailCache
+    >>> events = EventManager(time_range='LAST_HOUR').load_data()
+    >>> cache = DetailCache(path='./details.sqlite')
+    >>> events.load_details(cache=cache)
+    >>> print(cache.hit_rate)
+    """
+
+    def __init__(self, max_size=10000, ttl="1d", path=None):
+        """
+        Create or open a detail cache.
+
+        Arguments:
+            - `max_size` (`int`): Maximum number of entries in memory and on disk.
+            - `ttl` (`str` or `timedelta`): Time to live of the entries. Exemple: ``"1d"``, ``"12h"``.
+            - `path` (`str`): SQLite database file, entries are only kept in memory if `None`.
+        """
+        self.max_size = int(max_size)
+        """Maximum number of entries"""
+
+        self.ttl = (ttl if isinstance(ttl, timedelta) else parse_timedelta(ttl)).total_seconds()
+        """Time to live of the entries, in seconds"""
+
+        self.path = path
+        """SQLite database file"""
+
+        self.stats = {"hits": 0, "misses": 0}
+        """Cache hits and misses counters"""
+
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._puts = 0
+        if path:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS details (id TEXT PRIMARY KEY, time REAL, atime REAL, data TEXT)"
+            )
+            self._db.commit()
+
+    @property
+    def hit_rate(self):
+        """Ratio of cache hits, `None` if the cache has not been used."""
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else None
+
+    def get(self, key):
+        """
+        Returns the cached details or `None`.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry != None and entry[0] + self.ttl > now:
+                self._memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+            if self._db != None:
+                row = self._db.execute(
+                    "SELECT time, data FROM details WHERE id = ? AND time > ?",
+                    (key, now - self.ttl),
+                ).fetchone()
+                if row != None:
+                    self._db.execute(
+                        "UPDATE details SET atime = ? WHERE id = ?", (now, key)
+                    )
+                    self._db.commit()
+                    value = json.loads(row[1])
+                    self._put_memory(key, row[0], value)
+                    self.stats["hits"] += 1
+                    return value
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, value):
+        """
+        Store the details of an event.
+        """
+        now = time.time()
+        with self._lock:
+            self._put_memory(key, now, value)
+            if self._db != None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO details VALUES (?, ?, ?, ?)",
+                    (key, now, now, json.dumps(value)),
+                )
+                self._puts += 1
+                # Evict by batches
+                if self._puts % 100 == 0:
+                    self._evict_db(now)
+                self._db.commit()
+
+    def pop(self, key):
+        """
+        Remove the details of an event, in memory and on disk.
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db != None:
+                self._db.execute("DELETE FROM details WHERE id = ?", (key,))
+                self._db.commit()
+
+    def _put_memory(self, key, stored, value):
+        self._memory[key] = (stored, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _evict_db(self, now):
+        self._db.execute("DELETE FROM details WHERE time <= ?", (now - self.ttl,))
+        self._db.execute(
+            "DELETE FROM details WHERE id IN (SELECT id FROM details ORDER BY atime DESC LIMIT -1 OFFSET ?)",
+            (self.max_size,),
+        )
+
+    def clear(self):
+        """
+        Remove all entries, in memory and on disk.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self._db != None:
+                self._db.execute("DELETE FROM details")
+                self._db.commit()
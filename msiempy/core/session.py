@@ -1,6 +1,7 @@
 """
 HTTP level interface to the ESM API. Define `NitroSession` and `NitroError`. 
 """
+import os
 import logging
 import requests
 import json
@@ -9,6 +10,9 @@ import re
 import urllib.parse
 import inspect
 import time
+import atexit
+import threading
+import concurrent.futures
 import urllib3
 from urllib.parse import urlparse
 from string import Template
@@ -68,6 +72,9 @@ class NitroSession:
             self.logged_in = False
             self.login_info = dict()
             self.session = requests.Session()
+            self.cache = dict()
+            self._executor = None
+            self._executor_lock = threading.Lock()
 
             try:
                 requests.packages.urllib3.disable_warnings(
@@ -91,6 +98,7 @@ class NitroSession:
     """
     The singleton unique state.
     """
+    __shutdown_at_exit__ = False
 
     PARAMS = {
         "login": (
@@ -619,6 +627,56 @@ class NitroSession:
         self.login_info = dict()
         self.session = requests.Session()
         self.user_tz_id = None
+        self.cache = dict()
+
+    MAX_WORKERS = 32
+    """Number of threads of the shared executor, maximum concurrency of all `msiempy.core.types.NitroList.perform` calls"""
+
+    EXECUTOR_THREAD_PREFIX = "msiempy-perform"
+
+    def executor(self):
+        """
+        Returns the shared `concurrent.futures.ThreadPoolExecutor` used by `msiempy.core.types.NitroList.perform`.  
+        Created on first use with `MAX_WORKERS` threads, shut down with `shutdown` or at exit.
+        """
+        with self._executor_lock:
+            if self._executor == None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.MAX_WORKERS,
+                    thread_name_prefix=self.EXECUTOR_THREAD_PREFIX,
+                )
+                if not NitroSession.__shutdown_at_exit__:
+                    # The session state is shared, one registration is enough
+                    NitroSession.__shutdown_at_exit__ = True
+                    atexit.register(self.shutdown)
+            return self._executor
+
+    def shutdown(self, wait=True):
+        """
+        Shut down the shared executor, a new one is created on the next `executor` call.
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor != None:
+            executor.shutdown(wait=wait)
+
+    def cached(self, key, func, ttl=300):
+        """
+        Returns the value cached under `key`, or call `func()` and cache the returned value for `ttl` seconds.  
+        The cache is shared by all objects and cleared on logout.
+
+        Arguments:
+            - `key` (`tuple` or `str`): Cache key, should include the ESM host.
+            - `func` (`callable`): Function that returns the value.
+            - `ttl` (`int`): Time to live in seconds.
+        """
+        now = time.monotonic()
+        cached = self.cache.get(key)
+        if cached != None and cached[0] > now:
+            return cached[1]
+        value = func()
+        self.cache[key] = (now + ttl, value)
+        return value
 
     def api_request(
         self,
@@ -641,7 +699,7 @@ class NitroSession:
         Arguments:
             - `method` (`str`): ESM API enpoint name and url formatted parameters
             - `http` (`str`): HTTP method.
-            - `data` (`dict`): POST data to send
+            - `data` (`dict` or `str`): POST data to send. A `str` is sent as is, already formatted: JSON for the public API, see `_format_params` for the private API.
             - `callback` (`callable`): function to apply afterwards
             - `raw` (`bool`): If true will return the Response object from requests module. No retry when raw=True.
             - `secure` (`bool`): If true will not log the content of the request.
@@ -694,7 +752,9 @@ class NitroSession:
         if method == method.upper():
             privateApiCall = True
             url = self.BASE_URL_PRIV
-            http_data = self._format_params(method, **data)
+            http_data = (
+                data if isinstance(data, str) else self._format_params(method, **data)
+            )
             log.debug(
                 "Private API call : "
                 + str(method)
@@ -706,7 +766,7 @@ class NitroSession:
         else:
             url = self.BASE_URL
             if data:
-                http_data = json.dumps(data)
+                http_data = data if isinstance(data, str) else json.dumps(data)
 
         try:
             result = self.session.request(
@@ -1059,4 +1119,25 @@ class NitroError(Exception):
     It's used when the user/passwd is incorrect and other HTTP errors.
     """
 
-    pass
\ No newline at end of file
+    pass
+
+
+def _reinit_after_fork():
+    """
+    Re-initiate the session in a forked child process: the connection pool and the executor threads of the parent can't be used. 
+    The authentication headers and cookies are kept so the child doesn't need to login again.
+    """
+    if not NitroSession.__initiated__:
+        return
+    state = NitroSession.__unique_state__
+    session = requests.Session()
+    if state.get("session") != None:
+        session.headers.update(state["session"].headers)
+        session.cookies.update(state["session"].cookies)
+    state["session"] = session
+    state["_executor"] = None
+    state["_executor_lock"] = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
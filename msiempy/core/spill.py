@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Out of core storage of large query results. Define `SpillStore` and `SpilledList`.
+"""
+
+import os
+import json
+import sqlite3
+import tempfile
+import threading
+import collections
+import collections.abc
+import logging
+
+log = logging.getLogger("msiempy")
+
+
+class SpillStore:
+    """
+    Append-only on-disk SQLite store of rows (`dict`).
+
+    Rows are appended by parts, concurrently, as they arrive. Each row is stored as JSON with its part key and position.
+    Once all rows are appended, `seal` builds the position index: rows are then ordered by part key and position, and can be read by page.
+
+    Exemple:
+
+    >>> from msiempy import EventManager
+    >>> events = EventManager(time_range='LAST_7_DAYS', limit=500).load_data(max_query_depth=2, spill=True)
+    >>> for event in events:
+    ...     print(event['Alert.LastTime'])
+    """
+
+    def __init__(self, path=None):
+        """
+        Create an empty store.
+
+        Arguments:
+            - `path` (`str`): SQLite database file, must not exist. A temporary file is created and removed on `close` if `None`.
+        """
+        self._temporary = not path
+        if self._temporary:
+            fd, path = tempfile.mkstemp(prefix="msiempy-spill-", suffix=".sqlite")
+            os.close(fd)
+            os.remove(path)
+        elif os.path.exists(path):
+            raise FileExistsError("Spill store {} already exists".format(path))
+
+        self.path = path
+        """SQLite database file"""
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # Data is temporary, durability is not needed
+        self._db.execute("PRAGMA journal_mode = OFF")
+        self._db.execute("PRAGMA synchronous = OFF")
+        self._db.execute("CREATE TABLE rows (part TEXT, pos INTEGER, data TEXT)")
+        self._length = 0
+        self._sealed = False
+
+    def append(self, rows, part=""):
+        """
+        Append a part of rows. Thread safe.
+
+        Arguments:
+            - `rows` (`list[dict]`): Rows to store.
+            - `part` (`str`): Part key, rows are ordered by part keys then by position in the part.
+        """
+        if self._sealed:
+            raise RuntimeError("Can't append rows to a sealed spill store")
+        encoded = [(part, pos, json.dumps(row)) for pos, row in enumerate(rows)]
+        if not encoded:
+            return
+        with self._lock:
+            self._db.executemany("INSERT INTO rows VALUES (?, ?, ?)", encoded)
+            self._db.commit()
+            self._length += len(encoded)
+
+    def seal(self):
+        """
+        Build the position index, no more rows can be appended.
+        """
+        with self._lock:
+            if self._sealed:
+                return
+            self._db.execute(
+                "CREATE TABLE positions AS SELECT rowid AS rid FROM rows ORDER BY part, pos"
+            )
+            self._db.commit()
+            self._sealed = True
+        log.debug("Sealed spill store {} with {} rows".format(self.path, self._length))
+
+    def __len__(self):
+        return self._length
+
+    def read(self, start, stop):
+        """
+        Returns the rows from position `start` to `stop` (excluded) as `list[dict]`.
+        """
+        if not self._sealed:
+            raise RuntimeError("The spill store must be sealed to be read")
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT r.data FROM positions p JOIN rows r ON r.rowid = p.rid "
+                "WHERE p.rowid > ? AND p.rowid <= ? ORDER BY p.rowid",
+                (start, stop),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def close(self):
+        """
+        Close the database, remove it if it's temporary.
+        """
+        with self._lock:
+            if self._db == None:
+                return
+            self._db.close()
+            self._db = None
+        if self._temporary and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class SpilledList(collections.abc.Sequence):
+    """
+    Lazy read-only sequence over a sealed `SpillStore`.
+    Items are read by page from the disk, only the `cache_pages` most recently used pages are kept in memory.
+
+    Supports ``len()``, iteration, indexing and slicing. Slices are loaded in memory as `list`.
+    """
+
+    def __init__(self, store, item=None, page_size=1000, cache_pages=8, transform=None):
+        """
+        Arguments:
+            - `store` (`SpillStore`): The store, sealed if not already.
+            - `item` (`callable`): Called on every row `dict` to create the items, rows are returned as is if `None`.
+            - `page_size` (`int`): Number of rows per page.
+            - `cache_pages` (`int`): Maximum number of pages kept in memory.
+            - `transform` (`callable`): Called on every `list[dict]` page loaded from the disk.
+        """
+        store.seal()
+        self.store = store
+        """The `SpillStore`"""
+        self.page_size = int(page_size)
+        self.cache_pages = int(cache_pages)
+        self._item = item
+        self._transform = transform
+        self._pages = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.store)
+
+    def _page(self, number):
+        with self._lock:
+            page = self._pages.get(number)
+            if page != None:
+                self._pages.move_to_end(number)
+                return page
+        start = number * self.page_size
+        page = self.store.read(start, start + self.page_size)
+        if self._transform:
+            page = self._transform(page)
+        if self._item:
+            page = [self._item(row) for row in page]
+        with self._lock:
+            self._pages[number] = page
+            while len(self._pages) > self.cache_pages:
+                self._pages.popitem(last=False)
+        return page
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SpilledList index out of range")
+        return self._page(index // self.page_size)[index % self.page_size]
+
+    def __iter__(self):
+        for number in range(0, (len(self) + self.page_size - 1) // self.page_size):
+            yield from self._page(number)
+
+    def __repr__(self):
+        return "<SpilledList of {} items in {}>".format(len(self), self.store.path)
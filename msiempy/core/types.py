@@ -6,10 +6,19 @@ Base classes for SIEM interface objects and generic definitions. Define `NitroOb
 import logging
 import json
 import abc
+import re
+import time
+import threading
 import collections
+import collections.abc
+import copy
+import math
+import bisect
+import gzip
+import datetime
+import ipaddress
 
 import json
-import collections
 import tqdm
 import csv
 import concurrent.futures
@@ -20,7 +29,7 @@ import textwrap
 import logging
 from io import StringIO
 
-from .utils import regex_match
+from .utils import import_optional
 from .session import NitroSession
 
 log = logging.getLogger("msiempy")
@@ -32,6 +41,8 @@ class NitroObject(abc.ABC):
     Creates the object session.
     """
 
+    __slots__ = ()
+
     class NitroJSONEncoder(json.JSONEncoder):
         """
         Custom JSON encoder that will use the approprtiate propertie depending of the type of NitroObject.
@@ -40,15 +51,37 @@ class NitroObject(abc.ABC):
 
         def default(self, obj):  # pylint: disable=E0202
             if isinstance(obj, (NitroObject)):
-                return obj.data
+                return obj.data if isinstance(obj.data, (dict, list)) else list(obj.data)
+            # Decoded values
+            elif isinstance(obj, (datetime.datetime, datetime.date)):
+                return obj.isoformat()
+            elif isinstance(obj, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+                return str(obj)
             else:
                 return json.JSONEncoder.default(self, obj)
 
     def __init__(self):
-        self.nitro = NitroSession()
+        # Init the session if not already done
+        self.nitro
+
+    _session = None
+
+    @property
+    def nitro(self):
         """
-        `msiempy.core.session.NitroSession` object. Interface to the SIEM.
+        `msiempy.core.session.NitroSession` object. Interface to the SIEM.  
+        The reference is held at the class level and shared by all objects, unless it's set on the object.
         """
+        session = getattr(self, "_nitro", None)
+        if session != None:
+            return session
+        if NitroObject._session == None:
+            NitroObject._session = NitroSession()
+        return NitroObject._session
+
+    @nitro.setter
+    def nitro(self, session):
+        self._nitro = session
 
     @abc.abstractproperty
     def text(self):
@@ -74,16 +107,24 @@ class NitroObject(abc.ABC):
         pass
 
 
-class NitroDict(collections.UserDict, NitroObject):
+class NitroDict(collections.abc.MutableMapping, NitroObject):
     """
     Dict-Like object (Base class) to represent SIEM data.
     Exemple : `Event`, `Alarm`, etc...
 
     This classe and subclasses fully implements `dict` interface and is suitable for dictionnary operations, see: https://docs.python.org/3/library/stdtypes.html#mapping-types-dict
+
+    Lists values are wrapped in `NitroList` objects when first accessed.  
+
+    The objects have no instance `__dict__`: only `data` and the `nitro` session override are stored, in slots. 
+    Subclasses that need other attributes should declare them in their `__slots__`, or not declare `__slots__`. 
+    The session override is kept by `copy` but not pickled.
     
     :ivar data: Underlying `dict` object
     """
 
+    __slots__ = ("data", "_nitro", "__weakref__")
+
     def __init__(self, adict=None, id=None):
         """
         Create a new dict item
@@ -95,17 +136,44 @@ class NitroDict(collections.UserDict, NitroObject):
         Note:
             `NitroDict` is an abstract class and cannot be instanciated as is.  
         """
-        NitroObject.__init__(self)
-        collections.UserDict.__init__(self, adict)
-
-        if adict:
-            self.data = adict
+        # The session is not initiated here, it's done lazily by the `nitro` property.
+        # The dict is wrapped, not copied
+        self.data = adict if adict else dict()
         if id:
             self.data = self.data_from_id(id)
 
-        for key in list(self):
-            if isinstance(self[key], list):
-                self[key] = NitroList(alist=self[key])
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __getitem__(self, key):
+        value = self.data[key]
+        if value.__class__ is list:
+            value = self.data[key] = NitroList(alist=value)
+        return value
+
+    def __setitem__(self, key, value):
+        self.data[key] = value
+
+    def __delitem__(self, key):
+        del self.data[key]
+
+    def __reduce__(self):
+        # Pickle only the data, see NitroList.perform(executor="process")
+        return (_unpickle_dict, (self.__class__, self.data))
+
+    def copy(self):
+        """Returns a shallow copy of the object"""
+        new = copy.copy(self)
+        new.data = self.data.copy()
+        if getattr(self, "_nitro", None) != None:
+            new._nitro = self._nitro
+        return new
 
     def __str__(self):
         """str(obj) -> return text string."""
@@ -172,6 +240,174 @@ class NitroList(collections.UserList, NitroObject):
         else:
             collections.UserList.__init__(self, [])
 
+    TRANSIENT_ATTRIBUTES = ("_indexes", "_search", "perform_times")
+    """Attributes not pickled, the indexes and the perform statistics"""
+
+    def __getstate__(self):
+        return {
+            k: v for k, v in self.__dict__.items() if k not in self.TRANSIENT_ATTRIBUTES
+        }
+
+    def _get_indexes(self):
+        # Created on demand, some subclasses don't call NitroList.__init__
+        return self.__dict__.setdefault("_indexes", dict())
+
+    INDEX_KINDS = ("hash", "sorted")
+    """Kinds of index supported by `create_index`"""
+
+    def create_index(self, field, kind="hash", key=None):
+        """
+        Create a secondary index on a field to speed up repeated `get_by` (``hash`` or ``sorted``) and `get_range` (``sorted``) lookups.  
+        The index is built lazily on the first lookup and maintained on `append` and `extend`, other modifications of the list rebuild it on the next lookup. 
+        Slices of the list inherit the index definitions. 
+        Modifications of the items themselves (or of the underlying `data` list) are not tracked: call `reindex` after editing indexed fields in place.
+
+        Arguments:
+            - `field` (`str`): Item field.
+            - `kind` (`str`): ``"hash"`` for O(1) equality lookups, ``"sorted"`` for O(log n) equality and range lookups.
+            - `key` (`callable`): Function applied to the values before indexing and to the looked up values, i.e. ``lambda v: str(v).lower()`` or ``int``.
+
+        Returns:
+            The list itself.
+
+        Exemple:
+
+        >>> events.create_index('SrcIP')
+        >>> events.create_index('LastTime', kind='sorted', key=convert_to_time_obj)
+        >>> from_host = events.get_by('SrcIP', '10.0.0.1')
+        >>> last_hour = events.get_range('LastTime', datetime.now() - timedelta(hours=1))
+        """
+        if kind not in self.INDEX_KINDS:
+            raise ValueError(
+                "Unknown index kind {}. Accepted values are {}".format(
+                    kind, self.INDEX_KINDS
+                )
+            )
+        index = self._get_indexes().get(field)
+        if not index or index.kind != kind or index.key != key:
+            self._get_indexes()[field] = _FieldIndex(field, kind, key)
+        return self
+
+    def drop_index(self, field):
+        """Remove the index of a field."""
+        self._get_indexes().pop(field, None)
+
+    def reindex(self):
+        """Rebuild all indexes on the next lookup, after the items have been edited in place."""
+        self._indexes_changed()
+
+    def _index(self, field, kind=None):
+        """
+        Returns the up to date index of a field or `None`.
+        """
+        index = self._get_indexes().get(field)
+        if index == None or (kind and index.kind != kind):
+            return None
+        if not index.is_valid(self.data):
+            index.build(self.data)
+        return index
+
+    def get_by(self, field, value):
+        """
+        Returns the `list` of items whose `field` value equals `value`, in list order. 
+        Uses the field index if any, see `create_index`, scans the list otherwise.
+        """
+        index = self._index(field)
+        if index != None:
+            return [self.data[pos] for pos in index.lookup(value)]
+        return [item for item in self.data if item.get(field) == value]
+
+    def get_range(self, field, low=None, high=None):
+        """
+        Returns the `list` of items whose `field` value is between `low` and `high` (included), ordered by value. 
+        Uses the field ``sorted`` index if any, see `create_index`, scans the list otherwise.
+
+        Arguments:
+            - `field` (`str`): Item field.
+            - `low`: Lower bound, no lower bound if `None`.
+            - `high`: Upper bound, no upper bound if `None`.
+        """
+        index = self._index(field, kind="sorted")
+        if index != None:
+            return [self.data[pos] for pos in index.range(low, high)]
+        values = [
+            (item.get(field), pos)
+            for pos, item in enumerate(self.data)
+            if item.get(field) != None
+            and (low == None or item.get(field) >= low)
+            and (high == None or item.get(field) <= high)
+        ]
+        return [self.data[pos] for _, pos in sorted(values)]
+
+    def _indexes_added(self, start):
+        for index in self._get_indexes().values():
+            if index.data is self.data and index.size == start:
+                for pos in range(start, len(self.data)):
+                    index.add(self.data[pos], pos)
+
+    def _indexes_changed(self):
+        for index in self._get_indexes().values():
+            index.data = None
+        if self.__dict__.get("_search"):
+            self.__dict__["_search"].data = None
+
+    def append(self, item):
+        super().append(item)
+        self._indexes_added(len(self.data) - 1)
+
+    def extend(self, other):
+        start = len(self.data)
+        super().extend(other)
+        self._indexes_added(start)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def insert(self, i, item):
+        super().insert(i, item)
+        self._indexes_changed()
+
+    def pop(self, i=-1):
+        self._indexes_changed()
+        return super().pop(i)
+
+    def remove(self, item):
+        super().remove(item)
+        self._indexes_changed()
+
+    def clear(self):
+        super().clear()
+        self._indexes_changed()
+
+    def reverse(self):
+        super().reverse()
+        self._indexes_changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._indexes_changed()
+
+    def __setitem__(self, i, item):
+        super().__setitem__(i, item)
+        self._indexes_changed()
+
+    def __delitem__(self, i):
+        super().__delitem__(i)
+        self._indexes_changed()
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._indexes_changed()
+        return self
+
+    def __getitem__(self, i):
+        item = super().__getitem__(i)
+        if isinstance(i, slice) and isinstance(item, NitroList):
+            for index in self._get_indexes().values():
+                item.create_index(index.field, index.kind, index.key)
+        return item
+
     def __str__(self):
         """str(obj) -> return text string."""
         return "<{} containing {} elements, keys={}>".format(
@@ -182,7 +418,7 @@ class NitroList(collections.UserList, NitroObject):
         """List items keys. Every items should have the same set of keys."""
         # If new fields are added it won't show on text repr. Only json.
         manager_keys = set()
-        for item in list(self):
+        for item in self:
             manager_keys.update(getattr(item, "keys", set)())
         return manager_keys
 
@@ -212,9 +448,7 @@ class NitroList(collections.UserList, NitroObject):
 
         if format == "csv":
             file = StringIO()
-            dw = csv.DictWriter(file, fields, extrasaction="ignore")
-            dw.writeheader()
-            dw.writerows(list(self))
+            self.write_csv(file, fields)
             text = file.getvalue()
 
         elif format == "prettytable":
@@ -276,14 +510,137 @@ class NitroList(collections.UserList, NitroObject):
             cls=NitroObject.NitroJSONEncoder,
         )
 
-    def search(self, term, fields=None, invert=False):
+    def write_csv(self, fp, fields=None):
+        """
+        Write the list as CSV with a header, row by row.
+
+        Arguments:
+            - `fp` (file-like): Text file opened with ``newline=""``.
+            - `fields` (`list[str]`): Columns. If `None`: all items keys, sorted. That requires a first pass over the items.
+
+        Returns:
+            `int`: Number of rows written.
+        """
+        if not fields:
+            fields = sorted(self.keys())
+        writer = csv.DictWriter(fp, fields, extrasaction="ignore")
+        writer.writeheader()
+        count = 0
+        for item in self:
+            writer.writerow(item)
+            count += 1
+        return count
+
+    def write_jsonl(self, fp):
+        """
+        Write the list as JSON lines: one compact JSON object per item, row by row.
+
+        Arguments:
+            - `fp` (file-like): Text file.
+
+        Returns:
+            `int`: Number of rows written.
+        """
+        encoder = NitroObject.NitroJSONEncoder(separators=(",", ":"))
+        count = 0
+        for item in self:
+            fp.write(encoder.encode(item.data if isinstance(item, NitroObject) else item))
+            fp.write("\n")
+            count += 1
+        return count
+
+    EXPORT_FORMATS = ("csv", "jsonl")
+    """Formats supported by `export`"""
+
+    def export(self, path, format=None, fields=None, compress=None, buffering=1024 * 1024):
+        """
+        Stream the list to a CSV or JSON lines file. Items are written one by one: combined with ``load_data(spill=True)``, rows are never all held in memory.
+
+        Arguments:
+            - `path` (`str`): File path.
+            - `format` (`str`): ``"csv"`` or ``"jsonl"``. Guessed from the file extension if `None`. 
+            - `fields` (`list[str]`): CSV columns, see `write_csv`.
+            - `compress` (`bool`): Gzip the file. Guessed from the ``.gz`` extension if `None`.
+            - `buffering` (`int`): Write buffer size in bytes.
+
+        Returns:
+            `int`: Number of rows written.
+
+        Exemple:
+
+        >>> events = EventManager(time_range='LAST_24_HOURS').load_data(max_query_depth=2, spill=True)
+        >>> events.export('./events.jsonl.gz')
+        """
+        extensions = path.lower().split(".")
+        if compress == None:
+            compress = extensions[-1] == "gz"
+        if format == None:
+            format = extensions[-2 if extensions[-1] == "gz" else -1]
+        if format not in self.EXPORT_FORMATS:
+            raise AttributeError(
+                "Unknown `NitroList.export` format : {}. Accepted values are {}.".format(
+                    format, self.EXPORT_FORMATS
+                )
+            )
+
+        if compress:
+            fp = gzip.open(path, "wt", encoding="utf-8", newline="")
+        else:
+            fp = open(path, "w", encoding="utf-8", newline="", buffering=buffering)
+        with fp:
+            if format == "csv":
+                count = self.write_csv(fp, fields)
+            else:
+                count = self.write_jsonl(fp)
+        log.info("Exported {} rows to {}".format(count, path))
+        return count
+
+    def _columns(self, fields=None):
+        """
+        Returns the list data as a `dict` of columns: `{field: [values]}`. Missing values are `None`.
+        """
+        if not fields:
+            fields = sorted(self.keys())
+        return {f: [item.get(f) for item in self.data] for f in fields}
+
+    def to_dataframe(self, fields=None):
+        """
+        Returns a `pandas.DataFrame` built column by column from the list items.  
+        Requires the optional dependency `pandas`.
+
+        Arguments:
+            - `fields` (`list[str]`): Columns, all keys are used by default.
+        """
+        pandas = import_optional("pandas", "to_dataframe()")
+        return pandas.DataFrame(self._columns(fields))
+
+    def to_arrow(self, fields=None):
+        """
+        Returns a `pyarrow.Table` built column by column from the list items.  
+        Requires the optional dependency `pyarrow`.
+
+        Arguments:
+            - `fields` (`list[str]`): Columns, all keys are used by default.
+        """
+        pyarrow = import_optional("pyarrow", "to_arrow()")
+        return pyarrow.table(self._columns(fields))
+
+    def search(
+        self, term, fields=None, invert=False, trigrams=False, processes=None, cache=False
+    ):
         """
         Search elements in the list with a regex pattern
 
         Arguments:
             - `term` (`str`): String regex pattern to look for in the list items values. More on regex https://docs.python.org/3/library/re.html#re.Pattern.search
             - `invert` (`bool`): Weither or not to invert the search and return elements that doesn't not match search.
-            - `fields` (`list[str]`): Dictionnary fields to consider in the search, all keys are considered by default.  Patterns are compared to `str` representation of values.  
+            - `fields` (`list[str]`): Dictionnary fields to consider in the search, the keys of all items are considered by default (a missing key is searched as ``"None"``).  Patterns are compared to `str` representation of values.  
+            - `trigrams` (`bool`): Build and use a trigram index of the values to skip the items that can't match. Only used when `term` has no regex special characters and at least 3 characters. 
+                Speeds up repeated searches on the same list, with `cache`.
+            - `processes` (`int`): Number of processes to scan the list, for very large lists. The scan runs in the current process by default.
+            - `cache` (`bool`): Keep the `str` values (and the trigram index) of the items for the next searches. 
+                The cache is rebuilt when the list is modified, but modifications of the items themselves are not tracked: call `clear_search_cache` after editing items. 
+                The values are converted for every search by default.
 
         If you wish to apply non-regex filters to, use `filter()` or list comprehension::
 
@@ -303,32 +660,312 @@ class NitroList(collections.UserList, NitroObject):
         if not term:
             raise ValueError("")
 
+        if not isinstance(term, str):
+            raise ValueError("pattern must be str. Not {}".format(term))
+
         if fields:
             if not isinstance(fields, list):
                 fields = [fields]
         else:
-            fields = self.keys()
+            # The keys of all items, missing values are searched as "None"
+            fields = sorted(self.keys())
 
-        matching_items = list()
+        index = self._search_index(fields, cache)
+        if trigrams and not invert:
+            positions = index.candidates(term)
+        else:
+            positions = None
+
+        texts = index.texts if positions == None else [index.texts[p] for p in positions]
+        if processes and processes > 1:
+            size = max(1, len(texts) // (processes * 4))
+            offsets = range(0, len(texts), size)
+            with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+                found = executor.map(
+                    _search_texts,
+                    [term] * len(offsets),
+                    [texts[offset : offset + size] for offset in offsets],
+                    [invert] * len(offsets),
+                )
+                matching = [
+                    offset + i for offset, chunk in zip(offsets, found) for i in chunk
+                ]
+        else:
+            matching = _search_texts(re.compile(term), texts, invert)
 
-        if isinstance(term, str):
+        if positions != None:
+            matching = [positions[i] for i in matching]
 
-            for item in list(self):
-                for f in fields:
-                    if regex_match(term, str(item.get(f))) != invert:
-                        matching_items.append(item)
-                        break  # for f in fields
-
-            log.debug(
-                "You're search returned {} rows : {}".format(
-                    len(matching_items), str(matching_items)[:200] + "..."
+        matching_items = [self.data[pos] for pos in matching]
+        log.debug(
+            "You're search returned {} rows : {}".format(
+                len(matching_items), str(matching_items)[:200] + "..."
+            )
+        )
+
+        return type(self)(matching_items)
+
+    def _search_index(self, fields, cache=False):
+        """
+        Returns the up to date `_SearchIndex` of the fields, a new one if not `cache`.
+        """
+        if not cache:
+            index = _SearchIndex(fields)
+            index.build(self.data)
+            return index
+        index = self.__dict__.get("_search")
+        if index == None or index.fields != fields:
+            index = _SearchIndex(fields)
+            self.__dict__["_search"] = index
+        if not index.is_valid(self.data):
+            index.build(self.data)
+        return index
+
+    def clear_search_cache(self):
+        """Remove the values cached by `search(cache=True)`."""
+        self.__dict__.pop("_search", None)
+
+    def where(self, filters, logic="AND"):
+        """
+        Refine the list locally with query filters, without querying the SIEM again. 
+        All filters are compiled once and applied in one pass.
+
+        Arguments:
+            - `filters` (`list`): Filters, a filter can be a `tuple(field, [values])`, a `msiempy.event.FieldFilter`, 
+                a `msiempy.event.GroupFilter`, a SIEM formatted filter `dict` or a `callable(item) -> bool`. 
+                See `msiempy.event.FieldFilter.compile` for the operators semantics.
+            - `logic` (`str`): ``"AND"`` or ``"OR"``
+
+        Returns:
+            List-Like object of matching items
+
+        Exemple:
+
+        >>> events.load_data()
+        >>> https_events = events.where([("DstPort", ["443"]), ("SrcIP", ["10.0.0.0/8"])])
+        """
+        from ..event import FieldFilter, _QueryFilter
+
+        if not isinstance(filters, list):
+            filters = [filters]
+        predicates = list()
+        for afilter in filters:
+            if isinstance(afilter, tuple):
+                predicates.append(FieldFilter(afilter[0], afilter[1]).compile())
+            elif isinstance(afilter, _QueryFilter):
+                predicates.append(afilter.compile())
+            elif isinstance(afilter, dict):
+                predicates.append(_QueryFilter._compile(afilter))
+            elif callable(afilter):
+                predicates.append(afilter)
+            else:
+                raise TypeError(
+                    "Filters must be either a tuple, a FieldFilter, a GroupFilter, a dict or a callable. Not {}".format(
+                        afilter
+                    )
                 )
+
+        combine = any if logic == "OR" else all
+        return type(self)(
+            [item for item in self.data if combine(p(item) for p in predicates)]
+        )
+
+    AGGREGATIONS = ["count", "sum", "avg", "min", "max", "distinct", "top", "percentile"]
+    """
+    Aggregation functions accepted by `group_by`.
+    """
+
+    def group_by(self, fields, aggs=None):
+        """
+        Group the list items by one or several fields and compute aggregations, locally, in a single pass hash aggregation.  
+
+        Arguments:
+            - `fields` (`str` or `list[str]`): Group by field(s).
+            - `aggs` (`dict`): Aggregations to compute: `{name: (function, field, argument)}`. Only ``count`` by default.  
+                Functions:
+                    - ``"count"``: Number of items, no field required.
+                    - ``("sum", field)``, ``("avg", field)``: Sum or average of numerical values.
+                    - ``("min", field)``, ``("max", field)``: Minimum or maximum value. Numerical `str` values are compared as numbers.
+                    - ``("distinct", field)``: Number of distinct values.
+                    - ``("top", field, k)``: The `k` (default 10) most common values: `list[tuple(value, count)]`.
+                    - ``("percentile", field, q)``: Percentile `q` (default 50) of the values, nearest rank method. Numerical `str` values are compared as numbers.
+                
+                `None` and empty values are ignored.
+
+        Returns:
+            `NitroList` of `dict` with group fields and aggregations, in order of first appearance of the groups.
+
+        Exemple:
+
+        >>> events.group_by(["SrcIP", "DstIP"], aggs={"count": "count",
+                "events": ("sum", "EventCount"), "last": ("max", "LastTime"), "top_rules": ("top", "msg", 3)})
+        """
+        fields, aggs = self._parse_group_by(fields, aggs)
+        columns = self._aggregation_columns(fields, aggs)
+        return NitroList(alist=self._aggregate(fields, aggs, columns))
+
+    def _aggregation_columns(self, fields, aggs):
+        """
+        Returns the `dict` of columns required by `group_by`.
+        """
+        return self._columns(
+            fields + list(dict.fromkeys(a[2] for a in aggs if a[2] != None))
+        )
+
+    @classmethod
+    def _parse_group_by(cls, fields, aggs):
+        """
+        Returns the group by fields and the `list` of aggregations: `(name, function, field, argument)`.
+        """
+        if isinstance(fields, str):
+            fields = [fields]
+        if not aggs:
+            aggs = {"count": "count"}
+        parsed = list()
+        for name, spec in aggs.items():
+            if isinstance(spec, str):
+                spec = (spec,)
+            func, field, arg = (tuple(spec) + (None, None))[:3]
+            if func not in cls.AGGREGATIONS:
+                raise ValueError(
+                    "Unknown aggregation '{}'. Accepted values are: {}".format(
+                        func, ", ".join(cls.AGGREGATIONS)
+                    )
+                )
+            if func != "count" and field == None:
+                raise ValueError("Aggregation '{}' requires a field".format(name))
+            parsed.append((name, func, field, arg))
+        return list(fields), parsed
+
+    @staticmethod
+    def _number(value):
+        if isinstance(value, (int, float)):
+            return value
+        try:
+            return int(value)
+        except ValueError:
+            return float(value)
+
+    @classmethod
+    def _comparable(cls, codes, values):
+        """
+        Returns the `(code, value)` pairs of the non empty values. 
+        Numerical `str` values are converted with `_number` so they are compared as numbers, unless some values are not numerical.
+        """
+        pairs = [(c, v) for c, v in zip(codes, values) if v != None and v != ""]
+        try:
+            return [(c, cls._number(v) if isinstance(v, str) else v) for c, v in pairs]
+        except ValueError:
+            return pairs
+
+    @classmethod
+    def _aggregate(cls, fields, aggs, columns, numpy=None):
+        """
+        Hash aggregation of a `dict` of columns. 
+        The group of each row is resolved in one pass, then each aggregation is computed column by column.  
+        `numpy` module can be passed to accelerate count, sum and average on numerical columns.
+        """
+        length = len(next(iter(columns.values()))) if columns else 0
+        groups = dict()
+        codes = [
+            groups.setdefault(key, len(groups))
+            for key in (
+                zip(*(columns[f] for f in fields)) if fields else [()] * length
             )
+        ]
+        size = len(groups)
+        results = [dict(zip(fields, key)) for key in groups]
+
+        for name, func, field, arg in aggs:
+            values = columns[field] if field != None else None
+            if numpy != None and func in ["count", "sum", "avg"]:
+                aggregated = cls._aggregate_numpy(numpy, func, codes, values, size)
+                if aggregated != None:
+                    for result, value in zip(results, aggregated):
+                        result[name] = value
+                    continue
+
+            if func == "count":
+                aggregated = [0] * size
+                for code in codes:
+                    aggregated[code] += 1
+
+            elif func in ["sum", "avg"]:
+                sums, counts = [0] * size, [0] * size
+                for code, value in zip(codes, values):
+                    if value != None and value != "":
+                        sums[code] += cls._number(value)
+                        counts[code] += 1
+                aggregated = (
+                    sums
+                    if func == "sum"
+                    else [s / c if c else None for s, c in zip(sums, counts)]
+                )
 
-            return type(self)(matching_items) 
-        
-        else:
-            raise ValueError("pattern must be str. Not {}".format(term))
+            elif func in ["min", "max"]:
+                aggregated = [None] * size
+                better = (lambda a, b: a < b) if func == "min" else (lambda a, b: a > b)
+                for code, value in cls._comparable(codes, values):
+                    if aggregated[code] == None or better(value, aggregated[code]):
+                        aggregated[code] = value
+
+            elif func == "distinct":
+                sets = [set() for _ in range(size)]
+                for code, value in zip(codes, values):
+                    if value != None and value != "":
+                        sets[code].add(value)
+                aggregated = [len(s) for s in sets]
+
+            elif func == "top":
+                counters = [collections.Counter() for _ in range(size)]
+                for code, value in zip(codes, values):
+                    if value != None and value != "":
+                        counters[code][value] += 1
+                aggregated = [c.most_common(arg or 10) for c in counters]
+
+            elif func == "percentile":
+                lists = [list() for _ in range(size)]
+                for code, value in cls._comparable(codes, values):
+                    lists[code].append(value)
+                aggregated = list()
+                for group_values in lists:
+                    group_values.sort()
+                    rank = math.ceil((50 if arg == None else arg) / 100 * len(group_values))
+                    aggregated.append(
+                        group_values[max(rank, 1) - 1] if group_values else None
+                    )
+
+            for result, value in zip(results, aggregated):
+                result[name] = value
+
+        return results
+
+    @staticmethod
+    def _aggregate_numpy(numpy, func, codes, values, size):
+        """
+        Count, sum or average with `numpy.bincount`. Returns `None` if the values are not numerical.
+        """
+        codes = numpy.asarray(codes, dtype=numpy.intp)
+        if func == "count":
+            return numpy.bincount(codes, minlength=size).tolist()
+        try:
+            array = numpy.array(
+                [numpy.nan if v == None or v == "" else v for v in values],
+                dtype=numpy.float64,
+            )
+        except (ValueError, TypeError):
+            return None
+        valid = ~numpy.isnan(array)
+        sums = numpy.bincount(codes[valid], weights=array[valid], minlength=size)
+        if func == "sum":
+            integers = all(
+                isinstance(v, int) or (isinstance(v, str) and v.lstrip("-").isdigit())
+                for v in values
+                if v != None and v != ""
+            )
+            return [int(s) for s in sums] if integers else sums.tolist()
+        counts = numpy.bincount(codes[valid], minlength=size)
+        return [s / c if c else None for s, c in zip(sums.tolist(), counts.tolist())]
 
     def refresh(self):
         """
@@ -346,6 +983,10 @@ class NitroList(collections.UserList, NitroObject):
         workers=None,
         progress=False,
         message=None,
+        return_exceptions=False,
+        chunksize=1,
+        as_completed=False,
+        executor="thread",
     ):
         """
         Wrapper to execute a function on the list of elements
@@ -355,10 +996,18 @@ class NitroList(collections.UserList, NitroObject):
             - `data` (`list`): Choose a custom list to execute the function on (Default value = `list(self)`)
             - `func_args` (`dict`): arguments that will be passed by default to `func` in all calls.
             - `confirm` (`bool`): will ask interactively confirmation.
-            - `asynch` (`bool`): execute the task asynchronously with `concurrent.futures.ThreadPoolExecutor`. Carefull not to nest 2 asynchronous executions within eachother, it will be a mess.
-            - `workers` (`int`): number of parrallel tasks, mandatory if asynch is true.
+            - `asynch` (`bool`): execute the task asynchronously on the session shared executor, see `msiempy.core.session.NitroSession.executor`. 
+                Asynchronous calls can be nested: a task waiting for its sub tasks runs them itself, so all levels share the same threads without deadlock.
+            - `workers` (`int`): number of parrallel tasks, mandatory if asynch is true. At most `workers` tasks of the call are running at the same time.
             - `progress` (`bool`): to show progress bar with ETA (`tqdm`).
             - `message` (`str`): To show to the user.
+            - `return_exceptions` (`bool`): Return the exceptions raised by `func` in place of the results. 
+                Otherwise the first exception cancels the remaining tasks and is raised.
+            - `chunksize` (`int`): Number of elements per task, the elements of a task are processed sequentially. Bigger chunks reduce the overhead for fast functions.
+            - `as_completed` (`bool`): Returns a generator of `tuple(element, result)` in completion order instead of the list of results.
+            - `executor` (`str`): ``"thread"`` or ``"process"``. Use processes for CPU bound functions when `asynch` is true. 
+                With processes, `func` and the elements must be picklable (use module level functions) and `func` must return its work: modifications of the elements are not sent back. 
+                The elements are sent as lightweight copies of their data and the session is re-initiated in the child processes.
 
         This method is where the core of asynchronous tasks resides. `func` will be executed on all `data` elements.
         Basically, if `asynch==True`, will return::
@@ -372,8 +1021,10 @@ class NitroList(collections.UserList, NitroObject):
             for index_or_item in data:
                 returned.append(func(index_or_item))
 
+        The execution time of every element is stored in `perform_times`, in the same order as the elements. 
+
         Returns:
-            `list` of returned results.
+            `list` of returned results. Or `generator` of `tuple(element, result)` if `as_completed`.
         """
 
         log.debug(
@@ -405,9 +1056,6 @@ class NitroList(collections.UserList, NitroObject):
         # Setting the arguments on the function
         func = functools.partial(func, **(func_args if func_args != None else {}))
 
-        # The data returned by function
-        returned = list()
-
         # Usethe self contained data if not speficed otherwise
         elements = list(self)
         if data:
@@ -418,6 +1066,11 @@ class NitroList(collections.UserList, NitroObject):
                     "data argument must be a list not {}".format(type(data))
                 )
 
+        if asynch == True and not isinstance(workers, int):
+            raise AttributeError(
+                "When asynch == True : You must specify a integer value for workers"
+            )
+
         # Printing message if specified.
         tqdm_args = dict()
 
@@ -429,47 +1082,171 @@ class NitroList(collections.UserList, NitroObject):
         elif message != None:
             log.info(message)
 
-        # Runs the callable on list on executor or by iterating
-        if asynch == True:
-            if isinstance(workers, int):
-                if progress == True:
-                    if not self.nitro.config.quiet:
-                        # Need to call tqdm to have better support for concurrent futures executor
-                        # tqdm would load the whole bar intantaneously and not wait until the callable func returns.
-                        returned = list(
-                            tqdm.tqdm(
-                                concurrent.futures.ThreadPoolExecutor(
-                                    max_workers=workers
-                                ).map(func, elements),
-                                **tqdm_args
-                            )
-                        )
-                    else:
-                        returned = list(
-                            concurrent.futures.ThreadPoolExecutor(
-                                max_workers=workers
-                            ).map(func, elements)
-                        )
-                else:
-                    returned = list(
-                        concurrent.futures.ThreadPoolExecutor(max_workers=workers).map(
-                            func, elements
-                        )
+        bar = None
+        if progress == True and not self.nitro.config.quiet:
+            bar = tqdm.tqdm(**tqdm_args)
+
+        self.perform_times = [None] * len(elements)
+        """
+        Execution time in seconds of every element of the last `perform` call.
+        """
+
+        if executor not in self.PERFORM_EXECUTORS:
+            raise ValueError(
+                "executor must be one of {}, not {}".format(
+                    self.PERFORM_EXECUTORS, repr(executor)
+                )
+            )
+        if asynch == True and executor == "process" and chunksize == 1:
+            # Limit the inter-process communications
+            chunksize = max(1, len(elements) // (workers * 4))
+
+        results = self._perform_iter(
+            func,
+            elements,
+            self.perform_times,
+            workers if asynch == True else None,
+            max(1, int(chunksize)),
+            return_exceptions,
+            bar,
+            executor,
+        )
+
+        if as_completed:
+            return (
+                (elements[index], result)
+                for indexes, chunk_results in results
+                for index, result in zip(indexes, chunk_results)
+            )
+
+        returned = [None] * len(elements)
+        for indexes, chunk_results in results:
+            for index, result in zip(indexes, chunk_results):
+                returned[index] = result
+        return returned
+
+    PERFORM_EXECUTORS = ("thread", "process")
+    """Kinds of executor supported by `perform`"""
+
+    @staticmethod
+    def _perform_task(func, chunk, return_exceptions):
+        """
+        Run `func` on the elements of a chunk. Returns the results and the durations.
+        """
+        results = list()
+        durations = list()
+        for element in chunk:
+            start = time.perf_counter()
+            try:
+                results.append(func(element))
+            except Exception as err:
+                if not return_exceptions:
+                    raise
+                results.append(err)
+            finally:
+                durations.append(time.perf_counter() - start)
+        return (results, durations)
+
+    def _perform_iter(
+        self,
+        func,
+        elements,
+        times,
+        workers,
+        chunksize,
+        return_exceptions,
+        bar,
+        kind="thread",
+    ):
+        """
+        Generator of `tuple(indexes, results)` of the chunks of elements, in completion order. 
+        Runs the chunks sequentially if `workers` is `None`, concurrently otherwise with at most `workers` chunks submitted at the same time.
+        """
+        chunks = (
+            range(i, min(i + chunksize, len(elements)))
+            for i in range(0, len(elements), chunksize)
+        )
+        try:
+            if workers == None:
+                for indexes in chunks:
+                    results, durations = self._perform_task(
+                        func, elements[indexes.start : indexes.stop], return_exceptions
                     )
+                    self._perform_done(indexes, durations, times, bar)
+                    yield (indexes, results)
+                return
+
+            if kind == "process":
+                executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+                helping = False
             else:
-                raise AttributeError(
-                    "When asynch == True : You must specify a integer value for workers"
+                executor = NitroSession().executor()
+                # Nested call from a task of the shared executor: the calling thread runs the queued tasks of the call
+                # while it waits, instead of blocking its worker. No deadlock, and all levels share the same threads.
+                helping = threading.current_thread().name.startswith(
+                    NitroSession.EXECUTOR_THREAD_PREFIX
                 )
+            pending = dict()
+            try:
+                for indexes in chunks:
+                    if len(pending) >= workers:
+                        yield from self._perform_completed(pending, times, bar, helping)
+                    task = _PerformTask(
+                        self._perform_task,
+                        func,
+                        elements[indexes.start : indexes.stop],
+                        return_exceptions,
+                    )
+                    if kind == "process":
+                        pending[executor.submit(*task.call)] = (indexes, None)
+                    else:
+                        executor.submit(task.run)
+                        pending[task.future] = (indexes, task)
+                while pending:
+                    yield from self._perform_completed(pending, times, bar, helping)
+            finally:
+                # Cancel the remaining tasks if a task failed or the generator is closed
+                for future in pending:
+                    future.cancel()
+                if kind == "process":
+                    executor.shutdown()
+        finally:
+            if bar is not None:
+                bar.close()
+
+    @classmethod
+    def _perform_completed(cls, pending, times, bar, helping=False):
+        """
+        Wait for at least one pending future and yield the completed ones as `tuple(indexes, results)`. 
+        If `helping`, run a queued task in the current thread instead of waiting, if any.
+        """
+        if helping and any(task.run() for _, task in pending.values()):
+            done = [future for future in pending if future.done()]
         else:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+        for future in done:
+            indexes, _ = pending.pop(future)
+            results, durations = future.result()
+            cls._perform_done(indexes, durations, times, bar)
+            yield (indexes, results)
 
-            if progress == True:
-                if not self.nitro.config.quiet:
-                    elements = tqdm.tqdm(elements, **tqdm_args)
-
-            for index_or_item in elements:
-                returned.append(func(index_or_item))
+    @staticmethod
+    def _perform_done(indexes, durations, times, bar):
+        for index, duration in zip(indexes, durations):
+            times[index] = duration
+        if bar is not None:
+            bar.update(len(indexes))
 
-        return returned
+    def slowest(self, n=10):
+        """
+        Returns the `n` elements that took the longest time in the last `perform` call, as `list[tuple(seconds, element_index)]`.
+        """
+        times = getattr(self, "perform_times", [])
+        return sorted(
+            ((t, i) for i, t in enumerate(times) if t != None), reverse=True
+        )[:n]
 
     @staticmethod
     def _confirm_func(func, elements):
@@ -484,3 +1261,166 @@ class NitroList(collections.UserList, NitroObject):
             + "? [y/n]: "
         ):
             raise InterruptedError("The action was cancelled by the user.")
+
+
+class _FieldIndex(object):
+    """
+    Index of the positions of the items of a list by the value of a field. See `NitroList.create_index`.
+    """
+
+    __slots__ = ("field", "kind", "key", "data", "size", "_hash", "_keys", "_positions")
+
+    def __init__(self, field, kind="hash", key=None):
+        self.field = field
+        self.kind = kind
+        self.key = key
+        # Indexed list object and length, the index is valid only if the list is the same
+        self.data = None
+        self.size = 0
+
+    def is_valid(self, data):
+        return self.data is data and self.size == len(data)
+
+    def _key(self, value):
+        return self.key(value) if self.key and value != None else value
+
+    def build(self, data):
+        self.data = data
+        self.size = 0
+        self._hash = dict()
+        self._keys = list()
+        self._positions = list()
+        if self.kind == "sorted":
+            pairs = sorted(
+                (k, pos)
+                for k, pos in (
+                    (self._key(item.get(self.field)), pos) for pos, item in enumerate(data)
+                )
+                if k != None
+            )
+            self._keys = [k for k, _ in pairs]
+            self._positions = [pos for _, pos in pairs]
+            self.size = len(data)
+        else:
+            for pos, item in enumerate(data):
+                self.add(item, pos)
+
+    def add(self, item, pos):
+        k = self._key(item.get(self.field))
+        if self.kind == "sorted":
+            if k != None:
+                i = bisect.bisect_right(self._keys, k)
+                self._keys.insert(i, k)
+                self._positions.insert(i, pos)
+        else:
+            self._hash.setdefault(k, []).append(pos)
+        self.size += 1
+
+    def lookup(self, value):
+        k = self._key(value)
+        if self.kind == "sorted":
+            return sorted(
+                self._positions[
+                    bisect.bisect_left(self._keys, k) : bisect.bisect_right(self._keys, k)
+                ]
+            )
+        return self._hash.get(k, [])
+
+    def range(self, low=None, high=None):
+        start = 0 if low == None else bisect.bisect_left(self._keys, self._key(low))
+        stop = (
+            len(self._keys)
+            if high == None
+            else bisect.bisect_right(self._keys, self._key(high))
+        )
+        return self._positions[start:stop]
+
+
+class _PerformTask(object):
+    """
+    Task of `NitroList.perform` that can be run once, either by a thread of the executor or by the thread waiting for it.
+    """
+
+    __slots__ = ("call", "future", "_lock", "_claimed")
+
+    def __init__(self, func, *args):
+        self.call = (func,) + args
+        self.future = concurrent.futures.Future()
+        self._lock = threading.Lock()
+        self._claimed = False
+
+    def run(self):
+        """
+        Run the task if it's not already running or done. Returns `True` if the task has been run by this call.
+        """
+        with self._lock:
+            if self._claimed:
+                return False
+            self._claimed = True
+        if not self.future.set_running_or_notify_cancel():
+            return False
+        try:
+            self.future.set_result(self.call[0](*self.call[1:]))
+        except BaseException as err:
+            self.future.set_exception(err)
+        return True
+
+
+def _unpickle_dict(cls, data):
+    return cls(adict=data)
+
+
+def _search_texts(pattern, texts, invert=False):
+    """
+    Returns the positions of the `tuple[str]` texts that match the pattern (any of the values), or that don't if `invert`. 
+    Module level function so it can be called in other processes.
+    """
+    search = re.compile(pattern).search
+    if invert:
+        return [i for i, values in enumerate(texts) if not all(map(search, values))]
+    return [i for i, values in enumerate(texts) if any(map(search, values))]
+
+
+class _SearchIndex(object):
+    """
+    String values of the list items for `NitroList.search`, with an optional trigram index built on demand.
+    """
+
+    __slots__ = ("fields", "data", "size", "texts", "_trigrams")
+
+    def __init__(self, fields):
+        self.fields = fields
+        self.data = None
+        self.size = 0
+
+    def is_valid(self, data):
+        return self.data is data and self.size == len(data)
+
+    def build(self, data):
+        self.texts = [tuple(str(item.get(f)) for f in self.fields) for item in data]
+        self._trigrams = None
+        self.data = data
+        self.size = len(data)
+
+    def candidates(self, term):
+        """
+        Returns the positions of the items that contain all trigrams of the literal `term`, or `None` if `term` is a regex or is too short.
+        """
+        if len(term) < 3 or re.escape(term) != term:
+            return None
+        if self._trigrams == None:
+            trigrams = dict()
+            for pos, values in enumerate(self.texts):
+                for gram in set(
+                    value[i : i + 3] for value in values for i in range(len(value) - 2)
+                ):
+                    trigrams.setdefault(gram, []).append(pos)
+            self._trigrams = trigrams
+        postings = sorted(
+            (self._trigrams.get(term[i : i + 3], []) for i in range(len(term) - 2)),
+            key=len,
+        )
+        positions = set(postings[0])
+        for posting in postings[1:]:
+            positions.intersection_update(posting)
+        return sorted(positions)
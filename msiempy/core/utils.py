@@ -4,6 +4,10 @@
 
 import base64
 import re
+import sys
+import time
+import importlib
+import threading
 from functools import wraps
 from datetime import datetime, timedelta
 import dateutil.parser
@@ -78,6 +82,27 @@ def dehexify(data):
 #     return wrapper
 
 
+def import_optional(module, feature=None):
+    """
+    Import an optional dependency.
+
+    Arguments:
+        - `module` (`str`): Module name. Exemple: ``"pandas"``.
+        - `feature` (`str`): Name of the feature that requires the module, for the error message.
+
+    Raises:
+        `ImportError` with a hint if the module is not installed.
+    """
+    try:
+        return importlib.import_module(module)
+    except ImportError as err:
+        raise ImportError(
+            "{} requires the optional dependency '{}'. Install it with: pip install {}".format(
+                feature or "This feature", module, module.split(".")[0]
+            )
+        ) from err
+
+
 def tob64(s):
     """
     Encode a string to base64 almost like `echo '123' | base64` would do.
@@ -258,9 +283,10 @@ def convert_to_time_obj(time_str):
     return dateutil.parser.parse(time_str)
 
 
-def parse_query_result(columns, rows):
+def parse_query_result(columns, rows, intern=None):
     """
-    Parse the query results into a list of dict 
+    Parse the query results into a list of dict.  
+    The columns names are extracted once and shared by all rows.
     
     Arguments:
         - `columns` (`list[dict]`): Returned by the SIEM. Exemple:: 
@@ -274,6 +300,9 @@ def parse_query_result(columns, rows):
                 {'values': ['09/22/2020 15:51:14', 'Postfix Lost connection from host', '::', '144116287604260864|547122']}
             ]
 
+        - `intern` (`list[str]` or `True`): Columns which string values are interned with `sys.intern`, or `True` for all columns.  
+            Repeated values (rule messages, device IDs, etc) are then stored only once in memory.
+
     Returns :
         `list[dict]`
 
@@ -292,14 +321,18 @@ def parse_query_result(columns, rows):
         ]
 
     """
+    names = [column["name"] for column in columns]
+    if not intern:
+        return [dict(zip(names, row["values"])) for row in rows]
+
+    interned = [i for i, name in enumerate(names) if intern is True or name in intern]
     events = list()
     for row in rows:
-        event = dict()
-        for i in range(len(columns)):
-            event.update({columns[i]["name"]: row["values"][i]})
-
-        events.append(event)
-
+        values = list(row["values"])
+        for i in interned:
+            if isinstance(values[i], str):
+                values[i] = sys.intern(values[i])
+        events.append(dict(zip(names, values)))
     return events
 
 
@@ -352,6 +385,31 @@ def parse_timedelta(time_str):
     return timedelta(**time_params)
 
 
+def throttle(rate):
+    """
+    Returns a thread-safe function that blocks the calling thread so it's not called more than `rate` times per second. 
+    Use it to rate limit concurrent requests.
+
+    Arguments:
+        - `rate` (`float`): Maximum calls per second. No limit if `None` or ``0``.
+    """
+    if not rate:
+        return lambda: None
+    interval = 1.0 / rate
+    lock = threading.Lock()
+    next_call = [time.monotonic()]
+
+    def wait():
+        with lock:
+            now = time.monotonic()
+            delay = next_call[0] - now
+            next_call[0] = max(now, next_call[0]) + interval
+        if delay > 0:
+            time.sleep(delay)
+
+    return wait
+
+
 # Unused method
 # def sanitize_string(strg, valid_chars = ''):
 #     ''' Sanitize string
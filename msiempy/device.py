@@ -467,16 +467,19 @@ class DevTree(NitroList):
         """
         search_fields = ["ds_ip", "name", "hostname", "ds_id"]
 
-        found = [
-            ds
-            for ds in self.data
-            for field in search_fields
-            if str(term).lower() == str(ds[field]).lower()
-            if ds["zone_id"] == zone_id
-        ]
+        # Case insensitive indexes, built once and reused until the tree changes
+        positions = set()
+        for field in search_fields:
+            self.create_index(field, key=self._lower)
+            positions.update(self._index(field).lookup(term))
+
+        for pos in sorted(positions):
+            if self.data[pos]["zone_id"] == zone_id:
+                return self.data[pos]
 
-        if found:
-            return found[0]
+    @staticmethod
+    def _lower(value):
+        return str(value).lower()
 
     def search_ds_group(self, field, term, zone_id="0"):
         """
@@ -506,7 +509,8 @@ class DevTree(NitroList):
         Raises:
             `ValueError`: if field or term are None
         """
-        return (DataSource(adict=ds) for ds in self.data if ds.get(field) == term)
+        self.create_index(field)
+        return (DataSource(adict=ds) for ds in self.get_by(field, term))
 
     def refresh(self):
         """Rebuilds the devtree"""
@@ -546,6 +550,46 @@ class DevTree(NitroList):
         devtree = self._filter_bogus_ds(devtree)
         return devtree
 
+    @classmethod
+    def get_ds_ids(cls, clients=True, ttl=300):
+        """
+        Returns the `list` of all datasources IDs (IPSIDs) without building the whole `DevTree`: 
+        only the device tree call is parsed, plus the client lists of the client containers if `clients`. 
+        The zones and last times calls are skipped.  
+
+        The result is cached on the session for `ttl` seconds, see `msiempy.core.session.NitroSession.cached`.
+
+        Arguments:
+            - `clients` (`bool`): Include the client datasources IDs. Not needed for ``IPSID`` query filters, client datasources share the IPSID of their parent.
+            - `ttl` (`int`): Cache time to live in seconds.
+        """
+        # Instanciate without building the tree
+        tree = cls.__new__(cls)
+        NitroList.__init__(tree)
+        return tree.nitro.cached(
+            (tree.nitro.config.host, "ds_ids", clients),
+            partial(tree._list_ds_ids, clients),
+            ttl,
+        )
+
+    def _list_ds_ids(self, clients=True):
+        devtree = self._get_devtree()
+        if devtree == "ITEMS":
+            return []
+        devtree = self._format_devtree(devtree)
+        ds_ids = [ds["ds_id"] for ds in self._filter_bogus_ds(devtree)]
+        if clients:
+            containers = self._get_client_containers(devtree)
+            if containers:
+                for clients_list in self.perform(
+                    lambda ds: self._format_clients(self._get_clients(ds["ds_id"])),
+                    containers,
+                    asynch=True,
+                    workers=10,
+                ):
+                    ds_ids.extend(client["ds_id"] for client in clients_list)
+        return ds_ids
+
     def _get_devtree(self):
         """
         Returns:  
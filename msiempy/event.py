@@ -1,23 +1,47 @@
-"""Provide event management. Define `EventManager`, `Event`, `FieldFilter`, `GroupFilter`, `GroupedEventManager`, `GroupedEvent`.  
+"""Provide event management. Define `EventManager`, `Event`, `FieldFilter`, `GroupFilter`, `GroupedEventManager`, `GroupedEvent`, `EventTable`, `EventDecoder`.  
 
 Base object: 
     - `_QueryExecuteManager`
 """
 
+import os
+import re
 import time
+import bisect
+import math
+import json
 import collections
+import collections.abc
 import logging
+import threading
+import ipaddress
+import dateutil.tz
 from datetime import datetime, timedelta
 
 log = logging.getLogger("msiempy")
 
-from .core import NitroDict, NitroError, FilteredQueryList
+from .core import (
+    NitroDict,
+    NitroList,
+    NitroError,
+    NitroSession,
+    FilteredQueryList,
+    QueryCache,
+    DetailCache,
+    SpillStore,
+    SpilledList,
+)
 from .core.utils import (
     timerange_gettimes,
+    convert_to_time_obj,
+    format_esm_time,
     parse_query_result,
     format_fields_for_query,
     divide_times,
     parse_timedelta,
+    import_optional,
+    nitro_tz,
+    throttle,
 )
 from .device import DevTree
 
@@ -38,6 +62,11 @@ class _QueryExecuteManager(FilteredQueryList):
         # Declaring filter attributes before calling super() because it would overwrite values
         self._filters = []
 
+        self.query_stats = {"queries": 0, "polls": 0, "wait_time": 0.0}
+        """
+        Query statistics: number of ``queries`` executed, number of ``polls`` of the query status and total ``wait_time`` in seconds.
+        """
+
         # Calling super constructor : time_range, filters etc...
         super().__init__(*args, **kwargs)
 
@@ -78,16 +107,58 @@ class _QueryExecuteManager(FilteredQueryList):
         """
         self.nitro.request("close_query", resultID=resultID)
 
-    def _wait_for(self, resultID, wait_timeout_sec, sleep_time=0.2):
+    _POLL_MIN_SLEEP = 0.02
+    """Shortest time to sleep between two ``query_status`` polls, in seconds."""
+    _POLL_MAX_SLEEP = 2.0
+    """Longest time to sleep between two ``query_status`` polls, in seconds."""
+    _POLL_BACKOFF = 2
+    """Factor the sleep time is multiplied by after each unsuccessful poll."""
+    _POLL_FIRST_MAX_SLEEP = 0.5
+    """Longest time to sleep before the first ``query_status`` poll, in seconds."""
+
+    _completion_times = {}
+    """
+    Learned typical completion time (seconds) of queries by query shape.
+    Shared by all query objects, see `_query_shape`.
+    """
+
+    def _query_shape(self):
+        """
+        Returns a hashable key describing the query shape: the type of the query, the time span and the number of filters.
+        The time span is rounded to the power of 2 in seconds for custom time ranges.
+        """
+        if self.time_range == "CUSTOM" and self._start_time and self._end_time:
+            span = (self._end_time - self._start_time).total_seconds()
+            span = "2^{}s".format(int(math.log2(span)) if span >= 1 else 0)
+        else:
+            span = self.time_range
+        return (type(self).__name__, span, len(self._filters))
+
+    def _learn_completion_time(self, shape, duration):
+        """
+        Update the typical completion time of a query shape with an exponential moving average.
+        """
+        previous = self._completion_times.get(shape)
+        if previous is None:
+            self._completion_times[shape] = duration
+        else:
+            self._completion_times[shape] = 0.7 * previous + 0.3 * duration
+
+    def _wait_for(self, resultID, wait_timeout_sec, sleep_time=None):
         """
         Wait and sleep for the query.  
 
         Internal method called by _qry_load_data
+
+        The polling is adaptive by default: the first status request is sent after the learned typical completion time of the query shape (or `_POLL_MIN_SLEEP`), 
+        up to `_POLL_FIRST_MAX_SLEEP`, then the sleep time backs off exponentially up to `_POLL_MAX_SLEEP`.  
+        The completion time learned is the time of the last incomplete poll plus half of the last sleep time, so the backoff overshoot is not learned.  
+        The number of polls is counted in `query_stats`.  
         
         Arguments:
             - `resultID`: Query result ID
             - `wait_timeout_sec` (`int`): Duration in seconds until the query is completed or countdown arrives at zero.
-            - `sleep_time` (`float`): Time to sleep in the waiting loop
+            - `sleep_time` (`float`): Fixed time to sleep in the waiting loop. Disables the adaptive polling. 
 
         Returns: 
             `True`
@@ -99,17 +170,38 @@ class _QueryExecuteManager(FilteredQueryList):
 
         begin = datetime.now()
         timeout_delta = timedelta(seconds=wait_timeout_sec)
+        shape = self._query_shape()
+
+        if sleep_time:
+            next_sleep = sleep_time
+        else:
+            # The first poll lands near the expected completion time
+            next_sleep = min(
+                max(self._completion_times.get(shape, 0), self._POLL_MIN_SLEEP),
+                self._POLL_FIRST_MAX_SLEEP,
+            )
+        # Elapsed seconds at the last incomplete poll
+        incomplete = 0
 
         log.debug("Waiting for the query to be executed on the SIEM...")
 
+        self.query_stats["queries"] += 1
         while datetime.now() - timeout_delta < begin:
+            time.sleep(next_sleep)
             status = self.nitro.request(
                 "query_status", resultID=resultID  # ['value'] # APIv2 change
             )
+            self.query_stats["polls"] += 1
             if status["complete"] is True:
+                self.query_stats["wait_time"] += (datetime.now() - begin).total_seconds()
+                # The query completed during the last sleep
+                self._learn_completion_time(shape, incomplete + next_sleep / 2)
                 return True
-            else:
-                time.sleep(sleep_time)
+            incomplete = (datetime.now() - begin).total_seconds()
+            if not sleep_time:
+                next_sleep = min(next_sleep * self._POLL_BACKOFF, self._POLL_MAX_SLEEP)
+
+        self.query_stats["wait_time"] += (datetime.now() - begin).total_seconds()
         raise TimeoutError(
             "Query wait timeout. resultID={}, sleep_time={}, wait_timeout_sec={}".format(
                 resultID, sleep_time, wait_timeout_sec
@@ -139,10 +231,63 @@ class _QueryExecuteManager(FilteredQueryList):
             log.error(
                 "You requested duplicated fields, the parsed fields/values results will be missmatched !"
             )
-        events = parse_query_result(result["columns"], result["rows"])
+        events = parse_query_result(
+            result["columns"], result["rows"], intern=Event.INTERNED_FIELDS
+        )
         # log.debug("Event(s) parsed : "+str(events)[:200])
         return events
 
+    def to_dataframe(self, fields=None):
+        """
+        Returns a `pandas.DataFrame` of the results. Known field types are converted, see `Event.FIELDS_TYPES`.  
+        Requires the optional dependency `pandas`.
+
+        Arguments:
+            - `fields` (`list[str]`): Columns, all keys are used by default.
+        """
+        return Event._columns_to_dataframe(self._columns(fields))
+
+    def to_arrow(self, fields=None):
+        """
+        Returns a `pyarrow.Table` of the results. Known field types are converted, see `Event.FIELDS_TYPES`.  
+        Requires the optional dependency `pyarrow`.
+
+        Arguments:
+            - `fields` (`list[str]`): Columns, all keys are used by default.
+        """
+        return Event._columns_to_arrow(self._columns(fields))
+
+    def _get_times(self):
+        """
+        Returns the query time window as a `tuple(datetime, datetime)`. 
+        Can raise a `NotImplementedError` if the time range is not supported by `msiempy.core.utils.timerange_gettimes`.
+        """
+        if self.time_range != "CUSTOM":
+            start, end = timerange_gettimes(self.time_range)
+            return (convert_to_time_obj(start), convert_to_time_obj(end))
+        else:
+            return (self._start_time, self._end_time)
+
+    @staticmethod
+    def _ipsids_filter(ipsids):
+        """
+        Returns a SIEM formatted ``IPSID IN`` filter.
+        """
+        return {
+            "type": "EsmFieldFilter",
+            "field": {"name": "IPSID"},
+            "operator": "IN",
+            "values": [{"type": "EsmCompoundValue", "values": list(ipsids)}],
+        }
+
+    def _aggregation_columns(self, fields, aggs):
+        """
+        Known types of the aggregated fields are decoded for `group_by`, see `EventDecoder`.
+        """
+        return EventDecoder()._decode_aggregated(
+            super()._aggregation_columns(fields, aggs), fields, aggs
+        )
+
     @staticmethod
     def get_field_nickname(field):
         """
@@ -241,6 +386,10 @@ class EventManager(_QueryExecuteManager):
         # Store the query parent
         self._parent = _parent
 
+        # Spill store of the root query and sort key of the sub query results in the store, see load_data(spill)
+        self._spill = None
+        self._part = ""
+
         # Setting the default fields Adds the specified fields, make sure there is no duplicates and delete TABLE identifiers
         self.fields = []
         """
@@ -385,7 +534,20 @@ class EventManager(_QueryExecuteManager):
 
         return (events_raw, len(events_raw) < self.limit)
 
-    def load_data(self, workers=10, slots=10, delta=None, max_query_depth=0, **kwargs):
+    def load_data(
+        self,
+        workers=10,
+        slots=10,
+        delta=None,
+        max_query_depth=0,
+        cache=None,
+        as_table=False,
+        decode=False,
+        shard_by=None,
+        spill=None,
+        spill_cache=8,
+        **kwargs
+    ):
         """
         **Load the events data into the list.**  
         Wraps around `msiempy.event.EventManager._qry_load_data`.
@@ -398,14 +560,69 @@ class EventManager(_QueryExecuteManager):
             - `workers` (`int`): numbre of parrallels tasks, should be equal or less than the number of slots. Applicable if ``max_query_depth>0``. 
             - `retry` (`int`): number of time the query can be failed and retried.  (Default value = 1)
             - `wait_timeout_sec` (`int`): wait timeout in seconds. (Default value = 120)
+            - `cache` (`msiempy.core.cache.QueryCache` or `bool`): Serve closed time segments from a local on-disk cache and only query the missing segments. 
+                Each segment is loaded completely (according to ``max_query_depth``) so ``limit`` applies per segment. Use `True` for the default cache. 
+                Only used when the query is ordered by ``LastTime``.
+            - `as_table` (`bool`): Return the results as a columnar `EventTable` instead of loading `Event` objects into the list. Much lighter for large loads.
+            - `decode` (`bool` or `EventDecoder`): Decode the values of the known field types (times in the user timezone, integers and IPs), see `EventDecoder`. Values are strings by default.
+            - `shard_by` (`str`): ``"ipsid"`` to split the query on both time slices and groups of datasources IPSIDs, balanced by the datasources volumes. 
+                Use it when a few chatty datasources fill the ``limit`` in very short time windows. See `load_data_sharded`.
+            - `spill` (`bool` or `str` or `msiempy.core.SpillStore`): Spill the results to an on-disk store as they arrive instead of keeping them in memory. 
+                The list data becomes a read-only lazy `msiempy.core.SpilledList` that reads the events by page from the disk. 
+                Use `True` for a temporary store or a new SQLite file path. Not compatible with ``cache``, ``as_table`` and ``shard_by``.
+            - `spill_cache` (`int`): Number of pages of 1000 events kept in memory when ``spill`` is used.
 
         Returns: 
-            `msiempy.event.EventManager`
+            `msiempy.event.EventManager` or `msiempy.event.EventTable` if ``as_table=True``
 
         Note: 
             Only the first query is loaded asynchronously.
         """
 
+        if self._parent == None:
+            # A new store for every spilled query, none otherwise
+            self._spill = None
+            if spill:
+                if cache or as_table or shard_by:
+                    raise ValueError(
+                        "spill is not compatible with cache, as_table and shard_by"
+                    )
+                self._spill = spill if isinstance(spill, SpillStore) else SpillStore(
+                    spill if isinstance(spill, str) else None
+                )
+
+        if shard_by and self._parent == None:
+            if shard_by != "ipsid":
+                raise ValueError(
+                    "shard_by must be 'ipsid', not {}".format(repr(shard_by))
+                )
+            return self.load_data_sharded(
+                workers=workers,
+                slots=slots,
+                max_query_depth=max_query_depth,
+                as_table=as_table,
+                decode=decode,
+            )
+
+        if cache and self._parent == None and self._order_field.split(".")[-1] != "LastTime":
+            # Segments are merged in time order, other orders would differ from the SIEM's
+            log.warning(
+                "The cache is only used for queries ordered by LastTime, not {}. Loading without cache.".format(
+                    self._order_field
+                )
+            )
+            cache = None
+
+        if cache and self._parent == None:
+            return self._load_data_cached(
+                cache,
+                workers=workers,
+                slots=slots,
+                max_query_depth=max_query_depth,
+                as_table=as_table,
+                decode=decode,
+            )
+
         items, completed = self._qry_load_data()
 
         if not completed:
@@ -414,12 +631,8 @@ class EventManager(_QueryExecuteManager):
             if max_query_depth > 0:
                 # log.info("The query data couldn't be loaded in one request, separating it in sub-queries...")
 
-                if (
-                    self.time_range != "CUSTOM"
-                ):  # can raise a NotImplementedError if unsupported time_range
-                    start, end = timerange_gettimes(self.time_range)
-                else:
-                    start, end = self.start_time, self.end_time
+                # can raise a NotImplementedError if unsupported time_range
+                start, end = self._get_times()
 
                 if self._parent == None and isinstance(delta, str):
                     # if it's the first query and delta is speficied, cut the time_range in slots according to the delta
@@ -437,22 +650,11 @@ class EventManager(_QueryExecuteManager):
                         + ". Number of slots should be greater than the number of workers for better performance."
                     )
 
-                sub_queries = list()
-
-                for time in times:  # reversed(times) :
-                    # Divide the query in sub queries
-                    sub_query = EventManager(
-                        fields=self.fields,
-                        order=self.order,
-                        limit=self.limit,
-                        filters=self._filters,
-                        time_range="CUSTOM",
-                        start_time=time[0].isoformat(),
-                        end_time=time[1].isoformat(),
-                        _parent=self,
-                    )
-
-                    sub_queries.append(sub_query)
+                # Divide the query in sub queries
+                sub_queries = [self._sub_query(*time) for time in times]
+                for i, sub_query in enumerate(sub_queries):
+                    # Fixed width keys keep the spilled results in the order of the time slots
+                    sub_query._part = "{}{:05d}.".format(self._part, i)
 
                 results = self.perform(
                     EventManager.load_data,
@@ -461,28 +663,288 @@ class EventManager(_QueryExecuteManager):
                     asynch=self._parent == None,
                     progress=self._parent == None,
                     message="Loading data from "
-                    + start
+                    + format_esm_time(start)
                     + " to "
-                    + end
+                    + format_esm_time(end)
                     + ". In {} slots".format(len(times)),
-                    func_args=dict(slots=slots, max_query_depth=max_query_depth - 1),
+                    func_args=dict(
+                        slots=slots,
+                        max_query_depth=max_query_depth - 1,
+                        as_table=as_table,
+                    ),
                     workers=workers,
                 )
 
-                # Flatten the list of lists in a list
-                items = [item for sublist in results for item in sublist]
+                if as_table:
+                    items = EventTable.concat(results)
+                else:
+                    # Flatten the list of lists in a list
+                    items = [item for sublist in results for item in sublist]
+
+                # Sum up the sub queries statistics
+                for sub_query in sub_queries:
+                    for stat, value in sub_query.query_stats.items():
+                        self.query_stats[stat] += value
 
             else:
                 if not self._root_parent.not_completed:
                     log.warning(
                         "The query is not complete... Try to divide in more slots or increase max_query_depth"
                     )
-                    self._root_parent.not_completed = True
+                # Flag the query and all its parents
+                parent = self
+                while parent != None:
+                    parent.not_completed = True
+                    parent = parent._parent
+
+        if as_table:
+            if not isinstance(items, EventTable):
+                items = EventTable.from_dicts(items)
+            return self._get_decoder(decode).decode_table(items) if decode else items
+
+        store = self._root_parent._spill
+        if store != None:
+            # The rows of the sub queries are already in the store
+            store.append(items, self._part)
+            if self._parent != None:
+                self.data = []
+                return self
+            self.data = SpilledList(
+                store,
+                item=Event,
+                cache_pages=spill_cache,
+                transform=self._get_decoder(decode).decode_rows if decode else None,
+            )
+            return self
 
         events = [Event(adict=item) for item in items]
+        if decode:
+            self._get_decoder(decode).decode_rows(events)
         self.data = events
         return self
 
+    def _get_decoder(self, decode):
+        """
+        Returns the `EventDecoder` to use: `decode` itself or a new decoder in the user timezone.
+        """
+        if isinstance(decode, EventDecoder):
+            return decode
+        tz_id = getattr(self.nitro, "user_tz_id", None)
+        return EventDecoder(tz=nitro_tz(tz_id) if tz_id else None)
+
+    def _sub_query(self, start_time, end_time, filters=None):
+        """
+        Returns a new `EventManager` with the same fields, order, limit and filters (or `filters`) covering the time window.
+        """
+        return EventManager(
+            fields=self.fields,
+            order=self.order,
+            limit=self.limit,
+            filters=self._filters if filters == None else filters,
+            time_range="CUSTOM",
+            start_time=start_time.isoformat(),
+            end_time=end_time.isoformat(),
+            _parent=self,
+        )
+
+    SHARD_FILL = 0.8
+    """Target ratio of the `limit` filled by a shard of `load_data_sharded`, margin for the events received while loading"""
+
+    SHARD_MAX_IPSIDS = 200
+    """Maximum number of IPSIDs in a shard filter"""
+
+    def load_data_sharded(
+        self, workers=10, slots=10, max_query_depth=0, as_table=False, decode=False
+    ):
+        """
+        Load the data splitting the query on both time slices and datasources IPSIDs. Also accessible with ``load_data(shard_by="ipsid")``.  
+
+        A grouped query counts the events per IPSID in the query window. 
+        The datasources are then packed in groups of IPSIDs that should hold ``limit * SHARD_FILL`` events, 
+        and each group is divided in as many time slices as its volume requires: 
+        heavy datasources get their own group with fine time slices, quiet ones are queried together in one shot. 
+        The whole grid of sub queries is loaded concurrently.
+
+        The IPSIDs of an ``IPSID IN`` query filter are used if present, otherwise all datasources IPSIDs (see `msiempy.device.DevTree.get_ds_ids`).
+
+        Arguments:
+            - `workers` (`int`): Number of concurrent sub queries.
+            - `slots` (`int`): Passed to `load_data` for every sub query, applicable if ``max_query_depth>0``.
+            - `max_query_depth` (`int`): Passed to `load_data` for every sub query, in case the volumes changed since they were counted.
+            - `as_table` (`bool`): Return an `EventTable`, see `load_data`.
+            - `decode` (`bool` or `EventDecoder`): Decode the values, see `load_data`.
+
+        Returns: 
+            `msiempy.event.EventManager` or `msiempy.event.EventTable` if ``as_table=True``
+
+        Note:
+            The results are ordered within each shard only.
+        """
+        start, end = self._get_times()
+
+        ipsids = list()
+        filters = list()
+        for afilter in self.filters:
+            if (
+                afilter.get("field", {}).get("name") == "IPSID"
+                and afilter.get("operator") == "IN"
+            ):
+                try:
+                    ipsids.extend(_QueryFilter._basic_values(afilter["values"]))
+                    continue
+                except ValueError:
+                    # Watchlist values, keep the filter as is
+                    pass
+            filters.append(afilter)
+        if not ipsids:
+            # Client datasources share the IPSID of their parent
+            ipsids = DevTree.get_ds_ids(clients=False)
+
+        capacity = max(1, int(self.limit * self.SHARD_FILL))
+        volumes = self._ipsids_volumes(ipsids, filters, start, end)
+        shards = self._ipsids_shards(volumes, capacity, self.SHARD_MAX_IPSIDS)
+
+        sub_queries = list()
+        for group, volume in shards:
+            times = divide_times(start, end, slots=max(1, math.ceil(volume / capacity)))
+            sub_queries.extend(
+                self._sub_query(*time, filters=filters + [self._ipsids_filter(group)])
+                for time in times
+            )
+
+        results = self.perform(
+            EventManager.load_data,
+            sub_queries,
+            asynch=True,
+            progress=True,
+            message="Loading data from {} to {}. In {} shards of {} datasources".format(
+                format_esm_time(start), format_esm_time(end), len(sub_queries), len(ipsids)
+            ),
+            func_args=dict(
+                slots=slots, max_query_depth=max_query_depth, as_table=as_table
+            ),
+            workers=workers,
+        )
+
+        for sub_query in sub_queries:
+            for stat, value in sub_query.query_stats.items():
+                self.query_stats[stat] += value
+
+        if as_table:
+            table = EventTable.concat(results)
+            return self._get_decoder(decode).decode_table(table) if decode else table
+
+        self.data = [event for sub_query in results for event in sub_query]
+        if decode:
+            self._get_decoder(decode).decode_rows(self.data)
+        return self
+
+    @staticmethod
+    def _ipsids_volumes(ipsids, filters, start, end):
+        """
+        Returns the number of events per IPSID in the time window: `dict` of `{ipsid: count}`, with one grouped query.
+        """
+        query = GroupedEventManager(
+            field="IPSID",
+            filters=filters + [_QueryExecuteManager._ipsids_filter(ipsids)],
+            time_range="CUSTOM",
+            start_time=start.isoformat(),
+            end_time=end.isoformat(),
+        )
+        volumes = dict.fromkeys((str(i) for i in ipsids), 0)
+        for row in query.load_data(num_rows=len(volumes)):
+            volumes[str(row.get("IPSID"))] = int(row["COUNT(*)"])
+        return volumes
+
+    @staticmethod
+    def _ipsids_shards(volumes, capacity, max_ipsids):
+        """
+        Pack the IPSIDs in groups holding about `capacity` events (first fit decreasing). 
+        IPSIDs bigger than `capacity` have their own group.
+
+        Returns:
+            `list[tuple(list[str], int)]`: Groups of IPSIDs and their volume.
+        """
+        shards = list()
+        for ipsid, volume in sorted(volumes.items(), key=lambda i: i[1], reverse=True):
+            if volume < capacity:
+                for shard in shards:
+                    if shard[1] + volume <= capacity and len(shard[0]) < max_ipsids:
+                        shard[0].append(ipsid)
+                        shard[1] += volume
+                        break
+                else:
+                    shards.append([[ipsid], volume])
+            else:
+                shards.append([[ipsid], volume])
+        return [tuple(shard) for shard in shards]
+
+    def _load_data_cached(
+        self,
+        cache,
+        workers=10,
+        slots=10,
+        max_query_depth=0,
+        as_table=False,
+        decode=False,
+    ):
+        """
+        Load the data segment by segment, serve the closed segments from the cache and query the missing ones concurrently.  
+        Called by `load_data` when a ``cache`` is passed.
+        """
+        if cache is True:
+            cache = QueryCache()
+
+        start, end = self._get_times()
+        fingerprint = cache.fingerprint(self.fields, self.filters, self.order)
+        segments = cache.divide(start, end)
+
+        parts = [None] * len(segments)
+        missing = list()
+        for i, (seg_start, _, cacheable) in enumerate(segments):
+            if cacheable:
+                parts[i] = cache.get(fingerprint, seg_start)
+            if parts[i] is None:
+                missing.append(i)
+
+        log.info(
+            "{} time segments served from the cache, {} segments to query".format(
+                len(segments) - len(missing), len(missing)
+            )
+        )
+
+        sub_queries = [self._sub_query(*segments[i][:2]) for i in missing]
+        if sub_queries:
+            self.perform(
+                EventManager.load_data,
+                sub_queries,
+                asynch=True,
+                progress=True,
+                message="Loading {} time segments".format(len(sub_queries)),
+                func_args=dict(slots=slots, max_query_depth=max_query_depth),
+                workers=workers,
+            )
+
+        for i, sub_query in zip(missing, sub_queries):
+            parts[i] = [event.data for event in sub_query]
+            # Only store the segments that have been completely loaded
+            if segments[i][2] and not sub_query.not_completed:
+                cache.put(fingerprint, segments[i][0], segments[i][1], parts[i])
+            for stat, value in sub_query.query_stats.items():
+                self.query_stats[stat] += value
+
+        if self._order_direction == "DESCENDING":
+            parts.reverse()
+
+        if as_table:
+            table = EventTable.from_dicts(item for part in parts for item in part)
+            return self._get_decoder(decode).decode_table(table) if decode else table
+
+        self.data = [Event(adict=item) for part in parts for item in part]
+        if decode:
+            self._get_decoder(decode).decode_rows(self.data)
+        return self
+
     @property
     def _root_parent(self):
         """
@@ -493,6 +955,355 @@ class EventManager(_QueryExecuteManager):
         else:
             return self._parent._root_parent
 
+    def follow(
+        self,
+        interval=60,
+        overlap="2m",
+        max_seen=10000,
+        state_file=None,
+        max_polls=None,
+        max_query_depth=1,
+    ):
+        """
+        **Tail mode**: continuously poll the SIEM for new events and yield only the events that haven't been seen before.
+
+        The generator keeps a ``LastTime`` watermark and a bounded set of recently seen ``IPSIDAlertID``.
+        Each poll only queries the window from the watermark (minus the `overlap` that covers the SIEM ingestion lag) to now.
+
+        Arguments:
+            - `interval` (`int`): Seconds to sleep between two polls.
+            - `overlap` (`str`): Duration the queried window overlaps the previous one. Exemple: ``"2m"``.
+            - `max_seen` (`int`): Maximum number of recently seen event IDs kept to deduplicate the results.
+            - `state_file` (`str`): JSON file the watermark and seen IDs are persisted to after the events of every poll have been consumed. A restarted process resumes from this state without gaps or duplicates.
+            - `max_polls` (`int`): Stop after this number of polls. Default is to run forever.
+            - `max_query_depth` (`int`): Passed to `load_data` for every poll.
+
+        Yields:
+            New `Event` objects, in chronological order.
+
+        Note:
+            The query fields, filters and limit are used, the order is always ``("ASCENDING", "LastTime")``.
+            The first watermark is the start of the query time window if the time range is ``"CUSTOM"``, now minus the interval otherwise.
+
+        Exemple:
+
+        >>> from msiempy import EventManager
+        >>> for event in EventManager(filters=[('SrcIP', '10.0.0.0/8')]).follow(interval=30, state_file='./follow.json'):
+        ...     print(event['Rule.msg'])
+        """
+        seen = collections.OrderedDict()
+        watermark = None
+
+        if state_file and os.path.isfile(state_file):
+            with open(state_file, "r") as f:
+                state = json.load(f)
+            watermark = convert_to_time_obj(state["watermark"])
+            seen.update((i, None) for i in state["seen"])
+            log.info("Resuming from watermark {}".format(watermark))
+
+        if watermark == None:
+            if self.time_range == "CUSTOM" and self._start_time:
+                watermark = self._start_time
+            else:
+                watermark = datetime.now() - timedelta(seconds=interval)
+
+        overlap = parse_timedelta(overlap) if isinstance(overlap, str) else overlap
+        polls = 0
+
+        while max_polls == None or polls < max_polls:
+            if polls > 0:
+                time.sleep(interval)
+            polls += 1
+
+            query = EventManager(
+                fields=self.fields,
+                order=("ASCENDING", "LastTime"),
+                limit=self.limit,
+                filters=self._filters,
+                start_time=watermark - overlap,
+                end_time=datetime.now(),
+            )
+            query.load_data(max_query_depth=max_query_depth)
+
+            for stat, value in query.query_stats.items():
+                self.query_stats[stat] += value
+
+            new_events = list()
+            for event in query:
+                the_id = event.get_id()
+                if the_id in seen:
+                    continue
+                seen[the_id] = None
+                if len(seen) > max_seen:
+                    seen.popitem(last=False)
+                new_events.append(event)
+                last_time = convert_to_time_obj(event["LastTime"])
+                if last_time > watermark:
+                    watermark = last_time
+
+            log.debug(
+                "Follow poll {}: {} new events, watermark {}".format(
+                    polls, len(new_events), watermark
+                )
+            )
+
+            for event in new_events:
+                yield event
+
+            # Persist the state once the events have been consumed
+            if state_file:
+                with open(state_file, "w") as f:
+                    json.dump(
+                        {"watermark": watermark.isoformat(), "seen": list(seen)}, f
+                    )
+
+    FROM_IDS_CHUNK_SIZE = 100
+    """
+    Default number of event IDs per ``IN`` filter in `from_ids`.
+    """
+
+    @classmethod
+    def from_ids(
+        cls,
+        ids,
+        fields=None,
+        hints=None,
+        margin="1d",
+        chunk_size=None,
+        workers=10,
+    ):
+        """
+        Load many events by ID in a handful of queries. 
+        IDs are chunked into ``IPSIDAlertID IN`` filters and the chunks queries are executed concurrently.  
+        Only works with SIEM 11.2 or greater.
+
+        Arguments:
+            - `ids` (`list[str]`): Events IDs (i.e. : ``"144128388087414784|747122896"``).
+            - `fields` (`list[str]`): Additionnal event fields to load.
+            - `hints` (`dict`): Known approximate times of events: ``{id: datetime or str}`` (the alarm's triggered date for exemple).  
+                Hinted IDs are sorted by time and their chunks queries are narrowed to the hints time window. 
+                Other IDs are searched over the last year, or the last 45 days if the query fails.
+            - `margin` (`str` or `timedelta`): Margin around the hints.
+            - `chunk_size` (`int`): Number of IDs per query, default to `FROM_IDS_CHUNK_SIZE`.
+            - `workers` (`int`): Number of concurrent queries.
+
+        Returns:
+            `EventManager`: The events in the order of the IDs. IDs that could not be found are logged and skipped.
+        """
+        ids = list(dict.fromkeys(ids))
+        hints = {
+            i: t if isinstance(t, datetime) else convert_to_time_obj(t)
+            for i, t in (hints or {}).items()
+            if i in ids and t
+        }
+        margin = margin if isinstance(margin, timedelta) else parse_timedelta(margin)
+        chunk_size = chunk_size or cls.FROM_IDS_CHUNK_SIZE
+
+        chunks = list()
+        hinted = sorted([i for i in ids if i in hints], key=lambda i: hints[i])
+        for n in range(0, len(hinted), chunk_size):
+            part = hinted[n : n + chunk_size]
+            chunks.append(
+                (part, hints[part[0]] - margin, hints[part[-1]] + margin)
+            )
+        others = [i for i in ids if i not in hints]
+        for n in range(0, len(others), chunk_size):
+            chunks.append((others[n : n + chunk_size], None, None))
+
+        def load_chunk(chunk):
+            part, start, end = chunk
+            query = cls(
+                time_range="CUSTOM",
+                start_time=start or datetime.now() - timedelta(days=365),
+                end_time=end or datetime.now() + timedelta(days=1),
+                filters=[FieldFilter("IPSIDAlertID", part, operator="IN")],
+                fields=fields or [],
+                # Above the chunk size, so a chunk with all its events is not seen as truncated
+                limit=len(part) + 1,
+            )
+            try:
+                query.load_data()
+            except NitroError:
+                if start:
+                    raise
+                log.error(
+                    "Query failed, can't load events data from ids with 1 year timerange, looking at the last 45 days only..."
+                )
+                query.start_time = datetime.now() - timedelta(days=45)
+                query.load_data()
+            return query
+
+        results = cls().perform(
+            load_chunk,
+            chunks,
+            asynch=True,
+            workers=workers,
+            message="Loading {} events in {} queries...".format(len(ids), len(chunks)),
+        )
+
+        found = {event["IPSIDAlertID"]: event for query in results for event in query}
+        missing = [i for i in ids if i not in found]
+        if missing:
+            log.warning(
+                "{} event(s) could not be loaded from their IDs: {}".format(
+                    len(missing), ", ".join(missing[:10])
+                )
+            )
+        return cls(alist=[found[i] for i in ids if i in found])
+
+    def set_notes(
+        self, notes_or_func, no_date=False, workers=10, rate=None, callback=None
+    ):
+        """
+        Set the notes of all events concurrently. Desctructive action.  
+        Failures are collected instead of aborting the batch.
+
+        Arguments:
+            - `notes_or_func` (`str` or `callable`): The note, or a function called like `func(event)` that returns the event's note, events are skipped if it returns `None`.
+            - `no_date` (`bool`): Do not prefix the notes with the current date.
+            - `workers` (`int`): Number of concurrent requests.
+            - `rate` (`float`): Maximum number of requests per second. No limit if `None`.
+            - `callback` (`callable`): Progress callback, called like `callback(done, total)` after each request.
+
+        Returns:
+            `dict` of `{event id: exception}` for the events that could not be updated.
+
+        Exemple:
+
+        >>> events = EventManager(time_range='LAST_HOUR', filters=[('SrcIP', '10.0.0.0/8')]).load_data()
+        >>> failed = events.set_notes(lambda e: 'Scanned {}'.format(e['SrcIP']), workers=20, rate=50)
+
+        Note: 
+            Uses the internal API method `IPS_ADDALERTNOTE`
+        """
+        # Build all request datas upfront, the payloads are passed as is to the private API
+        payloads = list()
+        for event in self:
+            note = notes_or_func(event) if callable(notes_or_func) else notes_or_func
+            if note == None:
+                continue
+            data = event._note_data(note, no_date)
+            if data:
+                payloads.append(data)
+
+        if not payloads:
+            return dict()
+        if not self.nitro.logged_in:
+            self.nitro.login()
+
+        wait = throttle(rate)
+        lock = threading.Lock()
+        done = [0]
+        failed = dict()
+
+        def add_note(data):
+            wait()
+            try:
+                self.nitro.api_request(Event.NOTE_METHOD, data, secure=True)
+            except Exception as err:
+                log.warning("Could not set event {} note: {}".format(data["AID"], err))
+                failed[data["AID"]] = err
+            # The cached details include the previous notes
+            EventManager.DETAILS_CACHE.pop(data["AID"])
+            if callback:
+                with lock:
+                    done[0] += 1
+                    callback(done[0], len(payloads))
+
+        self.perform(
+            add_note,
+            payloads,
+            asynch=True,
+            workers=workers,
+            message="Setting {} events notes...".format(len(payloads)),
+        )
+        log.info(
+            "{} events notes set, {} failed".format(
+                len(payloads) - len(failed), len(failed)
+            )
+        )
+        return failed
+
+    DETAILS_CACHE = DetailCache()
+    """
+    Default in-memory `msiempy.core.DetailCache` shared by `load_details` and `get_details`. 
+    The events notes set with `set_notes` and `Event.set_note` are dropped from this cache.
+    """
+
+    def load_details(self, workers=10, cache=None):
+        """
+        Load the complete details of the events with ``ipsGetAlertData``. See `get_details`.
+
+        Arguments:
+            - `workers` (`int`): Number of concurrent requests.
+            - `cache` (`msiempy.core.DetailCache`): Details cache, default to `DETAILS_CACHE`. `False` to disable the cache.
+
+        Returns:
+            `EventManager`
+        """
+        details = self.get_details(
+            [event.get_id() for event in self], workers=workers, cache=cache
+        )
+        for event in self:
+            if event.get_id() in details:
+                event.data.update(details[event.get_id()])
+        return self
+
+    @classmethod
+    def get_details(cls, ids, workers=10, cache=None):
+        """
+        Returns the complete details of events with ``ipsGetAlertData``: `dict` of `{id: details}`.  
+        IDs are deduplicated, cached details are reused and the others are requested concurrently. 
+        Events that could not be loaded are logged and skipped.
+
+        Arguments:
+            - `ids` (`list[str]`): Events IDs (i.e. : ``"144128388087414784|747122896"``).
+            - `workers` (`int`): Number of concurrent requests.
+            - `cache` (`msiempy.core.DetailCache`): Details cache, default to `DETAILS_CACHE`. `False` to disable the cache.
+        """
+        if cache == None:
+            cache = cls.DETAILS_CACHE
+        details = dict()
+        missing = list()
+        for the_id in dict.fromkeys(i for i in ids if i):
+            cached = cache.get(the_id) if cache else None
+            if cached != None:
+                details[the_id] = cached
+            else:
+                missing.append(the_id)
+
+        manager = cls()
+
+        def get_alert_data(the_id):
+            try:
+                return manager.nitro.request("get_alert_data", id=the_id)
+            except NitroError as err:
+                log.warning("Could not load event {} details: {}".format(the_id, err))
+                return None
+
+        if missing:
+            loaded = manager.perform(
+                get_alert_data,
+                missing,
+                asynch=True,
+                workers=workers,
+                message="Loading {} events details...".format(len(missing)),
+            )
+            for the_id, data in zip(missing, loaded):
+                if data == None:
+                    continue
+                details[the_id] = data
+                if cache:
+                    cache.put(the_id, data)
+
+        if cache:
+            log.info(
+                "Events details: {} cached, {} requested. Cache hit rate: {:.0%}".format(
+                    len(details) - len(missing), len(missing), cache.hit_rate or 0
+                )
+            )
+        return details
+
     def get_possible_fields(self):
         """
         Return the list of possible fields that you can request in a Events query.
@@ -599,22 +1410,106 @@ class GroupedEventManager(_QueryExecuteManager):
 
     def clear_filters(self):
         """
-        Replace all filters by a non filtering rule with all datasources IPSIDs (Using `msiempy.device.DevTree`).  
+        Replace all filters by a non filtering rule with all datasources IPSIDs (Using `msiempy.device.DevTree.get_ds_ids`, cached on the session).  
         Acts like there is no filters.
         """
         log.info(
             "Setting a generic filter to the grouped query with all datasources IPSIDs..."
         )
-        tree = DevTree()
-        dsids = [d["ds_id"] for d in tree]
-        self._filters = [
-            {
-                "type": "EsmFieldFilter",
-                "field": {"name": "IPSID"},
-                "operator": "IN",
-                "values": [{"type": "EsmCompoundValue", "values": dsids}],
-            }
-        ]
+        self._filters = [self._all_ipsids_filter()]
+
+    @staticmethod
+    def _all_ipsids_filter():
+        """
+        Returns a SIEM formatted ``IPSID`` filter with all datasources IPSIDs.
+        """
+        # Client datasources share the IPSID of their parent, their lists are not downloaded
+        return _QueryExecuteManager._ipsids_filter(DevTree.get_ds_ids(clients=False))
+
+    def histogram(
+        self,
+        bucket="1h",
+        field=None,
+        start=None,
+        end=None,
+        count="COUNT(*)",
+        workers=10,
+        num_rows=500,
+    ):
+        """
+        Count the events by time buckets. One grouped query per bucket is executed, concurrently.  
+        The query filters are used, a generic ``IPSID`` filter is added if not present.
+
+        Arguments:
+            - `bucket` (`str` or `timedelta`): Bucket duration. Exemple: ``"1h"``, ``"15m"``, ``"1d"``.
+            - `field` (`str`): Group by field of each bucket, default to the query `field` or ``"IPSID"``.
+            - `start` (`str` or `datetime`): Start time, default to the query start time.
+            - `end` (`str` or `datetime`): End time, default to the query end time.
+            - `count` (`str`): ``"COUNT(*)"`` to count the event records or ``"SUM(Alert.EventCount)"`` to count aggregated events.
+            - `workers` (`int`): Number of concurrent queries.
+            - `num_rows` (`int`): Maximum number of groups of each bucket.
+
+        Returns:
+            `dict`: ``{"buckets": list[datetime], "series": {value: list[int]}}``. 
+            The buckets start times and the counts per bucket of each field value.
+
+        Exemple:
+
+        >>> query = GroupedEventManager(time_range="LAST_30_DAYS", field="DSIDSigID")
+        >>> hist = query.histogram(bucket="1h", workers=20)
+        >>> totals = [sum(counts) for counts in zip(*hist["series"].values())]
+        """
+        field = self.get_field_nickname(field) if field else (self.field or "IPSID")
+        delta = bucket if isinstance(bucket, timedelta) else parse_timedelta(bucket)
+        if not start or not end:
+            window = self._get_times()
+        start = (
+            (start if isinstance(start, datetime) else convert_to_time_obj(start))
+            if start
+            else window[0]
+        )
+        end = (
+            (end if isinstance(end, datetime) else convert_to_time_obj(end))
+            if end
+            else window[1]
+        )
+
+        buckets = list()
+        bucket_start = start
+        while bucket_start < end:
+            buckets.append((bucket_start, min(bucket_start + delta, end)))
+            bucket_start = bucket_start + delta
+
+        filters = list(self.filters)
+        if not any([f["field"]["name"] == "IPSID" for f in filters]):
+            filters.append(self._all_ipsids_filter())
+
+        def load_bucket(times):
+            query = GroupedEventManager(
+                field=field,
+                filters=filters,
+                time_range="CUSTOM",
+                start_time=times[0].isoformat(),
+                end_time=times[1].isoformat(),
+            )
+            return query.load_data(num_rows=num_rows)
+
+        results = self.perform(
+            load_bucket,
+            buckets,
+            asynch=True,
+            workers=workers,
+            progress=True,
+            message="Loading {} buckets of {}...".format(len(buckets), bucket),
+        )
+
+        series = dict()
+        for i, query in enumerate(results):
+            for row in query:
+                counts = series.setdefault(row.get(field), [0] * len(buckets))
+                counts[i] += int(row[count])
+
+        return {"buckets": [b[0] for b in buckets], "series": series}
 
     def _qry_load_data(self, num_rows=500, retry=1, wait_timeout_sec=120):
         """
@@ -754,6 +1649,22 @@ class Event(NitroDict):
 
     """
 
+    __slots__ = ("_key_index",)
+
+    INTERNED_FIELDS = [
+        "Rule.msg",
+        "Rule.NormID",
+        "Alert.IPSID",
+        "Alert.DSID",
+        "Alert.DSIDSigID",
+        "Alert.Protocol",
+        "Alert.Action",
+        "Alert.Severity",
+    ]
+    """
+    Fields with few distinct values which are interned when parsing the query results: repeated values are stored only once in memory.
+    """
+
     FIELDS_TABLES = [
         "Alert",
         "Rule",
@@ -1411,6 +2322,95 @@ class Event(NitroDict):
     Fields name mapping (reversed).  
     """
 
+    QUERY_TIME_FORMAT = "%m/%d/%Y %H:%M:%S"
+    """Format of the time fields returned by the query module: ``"%m/%d/%Y %H:%M:%S"``"""
+
+    FIELDS_TYPES = {
+        "LastTime": "datetime",
+        "FirstTime": "datetime",
+        "WriteTime": "datetime",
+        "EventCount": "int",
+        "Severity": "int",
+        "AvgSeverity": "int",
+        "AlertID": "int",
+        "IPSID": "int",
+        "NormID": "int",
+        "COUNT(*)": "int",
+        "SUM(Alert.EventCount)": "int",
+        "SrcIP": "ip",
+        "DstIP": "ip",
+    }
+    """
+    Known types of query fields: ``"datetime"``, ``"int"`` or ``"ip"``. Other fields are strings.  
+    Used to convert the values when exporting to pandas or Arrow.
+    """
+
+    @classmethod
+    def _field_type(cls, name):
+        """
+        Returns the known type of a field, based on the field name without table prefix, or `None`.
+        """
+        if name in cls.FIELDS_TYPES:
+            return cls.FIELDS_TYPES[name]
+        return cls.FIELDS_TYPES.get(name.split(".", 1)[-1])
+
+    @classmethod
+    def _columns_to_dataframe(cls, columns):
+        """
+        Build a `pandas.DataFrame` from a `dict` of columns and convert the known field types: 
+        time fields to ``datetime64``, integer fields to nullable ``Int64`` and IP fields to ``string`` (there is no IP dtype).
+        """
+        pandas = import_optional("pandas", "to_dataframe()")
+        series = dict()
+        for name, values in columns.items():
+            ftype = cls._field_type(name)
+            if ftype == "datetime":
+                series[name] = pandas.to_datetime(
+                    values, format=cls.QUERY_TIME_FORMAT, errors="coerce"
+                )
+            elif ftype == "int":
+                series[name] = pandas.array(
+                    pandas.to_numeric(values, errors="coerce"), dtype="Int64"
+                )
+            elif ftype == "ip":
+                series[name] = pandas.array(values, dtype="string")
+            else:
+                series[name] = values
+        return pandas.DataFrame(series)
+
+    @classmethod
+    def _columns_to_arrow(cls, columns):
+        """
+        Build a `pyarrow.Table` from a `dict` of columns and convert the known field types: 
+        time fields to ``timestamp[s]``, integer fields to ``int64``. Invalid values are nulls.
+        """
+        pyarrow = import_optional("pyarrow", "to_arrow()")
+        compute = import_optional("pyarrow.compute", "to_arrow()")
+        arrays = dict()
+        for name, values in columns.items():
+            ftype = cls._field_type(name)
+            if ftype in ["datetime", "int"]:
+                array = pyarrow.array(
+                    [v if isinstance(v, str) and v else None for v in values],
+                    type=pyarrow.string(),
+                )
+                if ftype == "datetime":
+                    array = compute.strptime(
+                        array,
+                        format=cls.QUERY_TIME_FORMAT,
+                        unit="s",
+                        error_is_null=True,
+                    )
+                else:
+                    valid = compute.match_substring_regex(array, r"^-?\d+$")
+                    array = compute.cast(
+                        compute.if_else(valid, array, None), pyarrow.int64()
+                    )
+                arrays[name] = array
+            else:
+                arrays[name] = values
+        return pyarrow.table(arrays)
+
     def __init__(self, *args, **kwargs):
         """
         Create a new event representation
@@ -1419,59 +2419,134 @@ class Event(NitroDict):
             - `adict` (`dict`): Event parameters
             - `id` (`str`): The event ``"IPSIDAlertID"`` to instanciate. Will load informations.  
         """
+        self._key_index = None
         super().__init__(*args, **kwargs)
 
     def _find_key(self, key):
         """
-        Use the fields name mapping to resolve internal name based on nickname
+        Use the fields name mapping to resolve internal name based on nickname.  
+
+        Raises:
+            `KeyError` if not found
+        """
+        resolved = self._lookup_key(key)
+        if resolved == None:
+            raise KeyError("Dictionnary key not found : {}".format(key))
+        return resolved
+
+    def _lookup_key(self, key):
+        """
+        Same as `_find_key` but returns `None` if the key is not found.  
+        The resolution index of the event's schema is kept on the instance and rebuilt if the keys changed.
         """
-        if collections.UserDict.__contains__(self, key):
+        data = self.data
+        if key in data:
             return key
-        if (
-            key in self.SIEM_FIELDS_MAP_NICKNAME_TO_INTERNAL_NAME.keys()
-            and collections.UserDict.__contains__(
-                self, self.SIEM_FIELDS_MAP_NICKNAME_TO_INTERNAL_NAME[key]
-            )
-        ):
-            return self.SIEM_FIELDS_MAP_NICKNAME_TO_INTERNAL_NAME[key]
+        index = self._key_index
+        if index != None:
+            resolved = index.get(key)
+            if resolved != None and resolved in data:
+                return resolved
+        # Unknown key or the keys changed since the index was built
+        self._key_index = index = self._get_key_index(data)
+        return index.get(key)
+
+    _KEY_INDEXES = dict()
+    """
+    Resolution indexes by schema (set of keys), shared by all events with the same keys. See `_get_key_index`.
+    """
 
-        # Loop thought FIELDS_TABLES and try with table prefix
-        # Old behaviour
-        for table in self.FIELDS_TABLES:
-            if collections.UserDict.__contains__(self, table + "." + key):
-                return table + "." + key
+    _KEY_INDEXES_MAX_SIZE = 1024
+    """Maximum number of cached resolution indexes"""
 
-        raise KeyError("Dictionnary key not found : {}".format(key))
+    @classmethod
+    def _get_key_index(cls, keys):
+        """
+        Returns the resolution index of a set of keys: a `dict` mapping every name that can be used to get an item (the key itself, 
+        it's nickname or the key without it's table prefix) to the actual key.  
+        The index is built once per schema and cached.
+        """
+        schema = (cls, frozenset(keys))
+        try:
+            return cls._KEY_INDEXES[schema]
+        except KeyError:
+            pass
+
+        index = dict()
+        # Table prefix, the first tables of FIELDS_TABLES have priority
+        for table in reversed(cls.FIELDS_TABLES):
+            prefix = table + "."
+            for key in schema[1]:
+                if key.startswith(prefix):
+                    index[key[len(prefix) :]] = key
+        # Nicknames
+        for key in schema[1]:
+            for nickname in cls._nicknames().get(key, ()):
+                index[nickname] = key
+        # The keys themselves
+        for key in schema[1]:
+            index[key] = key
+
+        if len(cls._KEY_INDEXES) >= cls._KEY_INDEXES_MAX_SIZE:
+            cls._KEY_INDEXES.clear()
+        cls._KEY_INDEXES[schema] = index
+        return index
+
+    @classmethod
+    def _nicknames(cls):
+        """
+        Returns the reversed `SIEM_FIELDS_MAP_NICKNAME_TO_INTERNAL_NAME` mapping: `{internal name: [nicknames]}`.
+        """
+        reverse = cls.__dict__.get("_nicknames_map")
+        if reverse == None:
+            reverse = dict()
+            for nickname, internal in cls.SIEM_FIELDS_MAP_NICKNAME_TO_INTERNAL_NAME.items():
+                reverse.setdefault(internal, []).append(nickname)
+            cls._nicknames_map = reverse
+        return reverse
+
+    @classmethod
+    def _resolve_key(cls, keys, key):
+        """
+        Resolve the key present in `keys` container that matches `key`: the key itself, it's internal name or the key prefixed by a table name.
+        
+        Raises:
+            `KeyError` if not found
+        """
+        if key in keys:
+            return key
+        try:
+            return cls._get_key_index(keys)[key]
+        except KeyError:
+            raise KeyError("Dictionnary key not found : {}".format(key)) from None
 
     def __getitem__(self, key):
         """
         Use the fields name mapping to offer better dict usage
         """
-        return collections.UserDict.__getitem__(self, self._find_key(key))
+        resolved = self._lookup_key(key)
+        if resolved == None:
+            raise KeyError("Dictionnary key not found : {}".format(key))
+        return NitroDict.__getitem__(self, resolved)
     
     def __delitem__(self, key):
         """
         Use the fields name mapping to offer better dict usage
         """
-        return collections.UserDict.__delitem__(self, self._find_key(key))
+        del self.data[self._find_key(key)]
 
     def __contains__(self, key):
         """
         Use the fields name mapping to offer better dict usage
         """
-        try:
-            return self._find_key(key) != None
-        except KeyError:
-            return False
+        return self._lookup_key(key) != None
     
     def __setitem__(self, key, value):
         """
         Use the fields name mapping to offer better dict usage
         """
-        try:
-            return collections.UserDict.__setitem__(self, self._find_key(key), value)
-        except KeyError:
-            return collections.UserDict.__setitem__(self, key, value)
+        resolved = self._lookup_key(key)
+        self.data[key if resolved == None else resolved] = value
 
     def get_id(self):
         """
@@ -1506,6 +2581,21 @@ class Event(NitroDict):
         Note: 
             Uses the internal API method `IPS_ADDALERTNOTE`
         """
+        data = self._note_data(note, no_date)
+        if data:
+            if not self.nitro.logged_in:
+                self.nitro.login()
+            self.nitro.api_request(self.NOTE_METHOD, data)
+            # The cached details include the previous notes
+            EventManager.DETAILS_CACHE.pop(data["AID"])
+
+    NOTE_METHOD = NitroSession.PARAMS["add_note_to_event_int"][0]
+    """Private API method used to set the notes"""
+
+    def _note_data(self, note, no_date=False):
+        """
+        Returns the ``IPS_ADDALERTNOTE`` request data or `None` if the event ID hasn't been found.
+        """
         the_id = self.get_id()
 
         if isinstance(the_id, str):
@@ -1520,16 +2610,16 @@ class Event(NitroDict):
 
             if no_date == False:
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                note = note.replace('"', '\\"').replace("\n", "\\n")
                 note = timestamp + " - " + note
 
-            self.nitro.request("add_note_to_event_int", id=the_id, note=note)
+            return {"AID": the_id, "NOTE": note}
         else:
             log.error(
                 "Couldn't set event's note, the event ID hasn't been found. Event: {}".format(
                     self
                 )
             )
+            return None
 
     def data_from_id(self, id, use_query=False, extra_fields=[]):
         """
@@ -1543,32 +2633,13 @@ class Event(NitroDict):
         """
 
         if use_query == True:
-            f = FieldFilter("IPSIDAlertID", id, operator="EQUALS")
-            e = EventManager(
-                time_range="CUSTOM",
-                start_time=datetime.now() - timedelta(days=365),
-                end_time=datetime.now() + timedelta(days=1),
-                filters=[f],
-                fields=extra_fields,
-                limit=2,
-            )
-            try:
-                e.load_data()
-            except NitroError:
-                log.error(
-                    "Query failed, can't load event's data from id with 1 year timerange, looking at the last 45 days only..."
-                )
-                e.start_time = datetime.now() - timedelta(days=45)
-                e.load_data()
-
+            e = EventManager.from_ids([id], fields=extra_fields)
             if len(e) == 1:
                 return e[0]
             else:
                 raise NitroError(
                     "Could not load event : "
                     + str(id)
-                    + " from query :"
-                    + str(e.__dict__)
                     + ". Try with use_query=False."
                 )
 
@@ -1646,6 +2717,8 @@ class GroupedEvent(Event):
 
     """
 
+    __slots__ = ()
+
     SIEM_FIELDS_MAP_NICKNAME_TO_INTERNAL_NAME = (
         Event.SIEM_FIELDS_MAP_NICKNAME_TO_INTERNAL_NAME
     )
@@ -1655,9 +2728,553 @@ class GroupedEvent(Event):
     ] = "SUM(Alert.EventCount)"
 
 
+class EventDecoder(object):
+    """
+    Schema-driven decoder of query results values. Converts whole columns at once according to the known field types (see `Event.FIELDS_TYPES`):  
+        - time fields to `datetime` parsed with the single known query format ``"%m/%d/%Y %H:%M:%S"`` (no format guessing), in the user timezone if specified,
+        - integer fields to `int`,
+        - IP fields to `ipaddress.IPv4Address` or `ipaddress.IPv6Address`.
+
+    Values that can't be decoded are left as is. The converter of each column is resolved once and cached.  
+
+    Used by `EventManager.load_data` when ``decode=True``.
+
+    Exemple:
+
+    >>> from msiempy.event import EventDecoder
+    >>> decoder = EventDecoder(tz='America/New_York')
+    >>> decoder.decode_column('Alert.LastTime', ['06/07/2020 17:14:21'])
+    [datetime.datetime(2020, 6, 7, 17, 14, 21, tzinfo=tzfile('/usr/share/zoneinfo/America/New_York'))]
+    """
+
+    def __init__(self, tz=None, event_class=None):
+        """
+        Create a new decoder
+
+        Arguments:
+            - `tz` (`str` or `datetime.tzinfo`): Timezone of the time values, naive datetimes are returned if `None`. 
+                The user timezone is returned by `msiempy.core.utils.nitro_tz(NitroSession().user_tz_id)`.
+            - `event_class` (`type`): `Event` class that defines the fields types. Default to `Event`.
+        """
+        self.tz = dateutil.tz.gettz(tz) if isinstance(tz, str) else tz
+        """Timezone of the time values"""
+        self._event_class = event_class or Event
+        self._converters = dict()
+
+    def _converter(self, column):
+        """
+        Returns the cached converter function of a column or `None`.
+        """
+        try:
+            return self._converters[column]
+        except KeyError:
+            ftype = self._event_class._field_type(column)
+            converter = {
+                "datetime": self._decode_times,
+                "int": self._decode_ints,
+                "ip": self._decode_ips,
+            }.get(ftype)
+            self._converters[column] = converter
+            return converter
+
+    def decode_column(self, column, values):
+        """
+        Returns the `list` of decoded values of a column.
+        """
+        converter = self._converter(column)
+        if converter == None:
+            return values
+        return converter(values)
+
+    def decode_table(self, table):
+        """
+        Decode a `EventTable` in place. Returns the table.
+        """
+        for column in table.columns:
+            table._data[column] = self.decode_column(column, table._data[column])
+        return table
+
+    def _decode_aggregated(self, columns, fields, aggs):
+        """
+        Decode the time and integer columns that are aggregated by `msiempy.core.types.NitroList.group_by` (sum, min, etc), 
+        group by fields are left as is. Returns the columns.
+        """
+        for _, func, field, _ in aggs:
+            if (
+                field in fields
+                or func not in ["sum", "avg", "min", "max", "percentile"]
+                or self._event_class._field_type(field) not in ["datetime", "int"]
+            ):
+                continue
+            columns[field] = self.decode_column(field, columns[field])
+        return columns
+
+    def decode_rows(self, rows):
+        """
+        Decode a `list[dict]` in place, column by column. Returns the rows.
+        """
+        columns = set(key for row in rows for key in row.keys())
+        for column in columns:
+            if self._converter(column) == None:
+                continue
+            values = self.decode_column(column, [row.get(column) for row in rows])
+            for row, value in zip(rows, values):
+                if column in row.keys():
+                    row[column] = value
+        return rows
+
+    def _decode_times(self, values):
+        # Memoize the parsed values, many events share the same timestamp
+        memo = dict()
+        tz = self.tz
+        decoded = list()
+        for v in values:
+            try:
+                decoded.append(memo[v])
+                continue
+            except KeyError:
+                pass
+            except TypeError:
+                decoded.append(v)
+                continue
+            try:
+                # Fixed format: %m/%d/%Y %H:%M:%S
+                if len(v) != 19:
+                    raise ValueError()
+                d = datetime(
+                    int(v[6:10]),
+                    int(v[0:2]),
+                    int(v[3:5]),
+                    int(v[11:13]),
+                    int(v[14:16]),
+                    int(v[17:19]),
+                    tzinfo=tz,
+                )
+            except (ValueError, TypeError):
+                d = v
+            memo[v] = d
+            decoded.append(d)
+        return decoded
+
+    @staticmethod
+    def _decode_ints(values):
+        decoded = list()
+        for v in values:
+            try:
+                decoded.append(int(v))
+            except (ValueError, TypeError):
+                decoded.append(v)
+        return decoded
+
+    @staticmethod
+    def _decode_ips(values):
+        memo = dict()
+        decoded = list()
+        for v in values:
+            try:
+                decoded.append(memo[v])
+                continue
+            except (KeyError, TypeError):
+                pass
+            try:
+                ip = ipaddress.ip_address(v)
+            except ValueError:
+                ip = v
+            try:
+                memo[v] = ip
+            except TypeError:
+                pass
+            decoded.append(ip)
+        return decoded
+
+
+class EventTable(object):
+    """
+    Columnar container of event query results. Returned by `EventManager.load_data` when ``as_table=True``.
+
+    Holds one list of values per field and a shared column header instead of one `Event` per row, memory usage is much lower for large loads.  
+    Rows are accessed as `EventRow` views that support `Event`-style `__getitem__` with nickname resolution.
+
+    Exemple:
+
+    >>> table = EventManager(fields=['SrcIP'], limit=500).load_data(as_table=True, max_query_depth=2)
+    >>> table.column('SrcIP')[:3]
+    ['22.22.24.4', '213.235.88.182', '213.235.88.182']
+    >>> table[0]['SrcIP']
+    '22.22.24.4'
+    """
+
+    def __init__(self, columns=None, data=None, event_class=None):
+        """
+        Create a new table
+
+        Arguments:
+            - `columns` (`list[str]`): Column names
+            - `data` (`dict[str, list]`): Values per column, all lists must have the same length.
+            - `event_class` (`type`): `Event` class used to resolve the keys and to build `Event` objects. Default to `Event`.
+        """
+        self.columns = list(columns or [])
+        """Column names"""
+        self._data = data if data != None else {c: [] for c in self.columns}
+        self._length = len(self._data[self.columns[0]]) if self.columns else 0
+        self._event_class = event_class or Event
+        self._resolved = {}
+
+    @classmethod
+    def from_dicts(cls, rows, columns=None, event_class=None):
+        """
+        Build a table from a `list[dict]`. Missing values are set to `None`.
+
+        Arguments:
+            - `rows` (`list[dict]`): Rows
+            - `columns` (`list[str]`): Column names, default to all keys of the rows.
+        """
+        table = cls(columns, event_class=event_class)
+        table.extend(rows)
+        return table
+
+    @classmethod
+    def concat(cls, tables):
+        """
+        Concatenate tables, columns are merged.
+        """
+        tables = list(tables)
+        result = cls(event_class=tables[0]._event_class if tables else None)
+        for table in tables:
+            result._add_columns(table.columns)
+            for c in result.columns:
+                if c in table._data:
+                    result._data[c].extend(table._data[c])
+                else:
+                    result._data[c].extend([None] * len(table))
+            result._length += len(table)
+        return result
+
+    def _add_columns(self, columns):
+        for c in columns:
+            if c not in self._data:
+                self.columns.append(c)
+                self._data[c] = [None] * self._length
+                self._resolved = {}
+
+    def append(self, row):
+        """Append a `dict` to the table."""
+        self.extend([row])
+
+    def extend(self, rows):
+        """Append a `list[dict]` to the table."""
+        for row in rows:
+            if any(k not in self._data for k in row):
+                self._add_columns(list(row))
+            for c in self.columns:
+                self._data[c].append(row.get(c))
+            self._length += 1
+
+    def _find_column(self, key):
+        """
+        Resolve the column name from a field name or nickname.
+        """
+        try:
+            return self._resolved[key]
+        except KeyError:
+            column = self._event_class._resolve_key(self._data, key)
+            self._resolved[key] = column
+            return column
+
+    def column(self, key):
+        """
+        Returns the `list` of values of a column. 
+        The key is resolved like `Event` keys: ``table.column('SrcIP')`` is the same as ``table.column('Alert.SrcIP')``.
+        """
+        return self._data[self._find_column(key)]
+
+    def keys(self):
+        """Column names"""
+        return list(self.columns)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield EventRow(self, i)
+
+    def __getitem__(self, index):
+        """
+        `int` index returns a `EventRow`, `slice` returns a new `EventTable`.
+        """
+        if isinstance(index, slice):
+            return EventTable(
+                self.columns,
+                {c: self._data[c][index] for c in self.columns},
+                self._event_class,
+            )
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("EventTable index out of range")
+        return EventRow(self, index)
+
+    def __repr__(self):
+        return "<EventTable containing {} rows, columns={}>".format(
+            self._length, self.columns
+        )
+
+    def _columns(self, fields=None):
+        if not fields:
+            return self._data
+        return {f: self.column(f) for f in fields}
+
+    def to_dataframe(self, fields=None):
+        """
+        Returns a `pandas.DataFrame` built directly from the columns. Known field types are converted, see `Event.FIELDS_TYPES`.  
+        Requires the optional dependency `pandas`.
+        """
+        return self._event_class._columns_to_dataframe(self._columns(fields))
+
+    def to_arrow(self, fields=None):
+        """
+        Returns a `pyarrow.Table` built directly from the columns. Known field types are converted, see `Event.FIELDS_TYPES`.  
+        Requires the optional dependency `pyarrow`.
+        """
+        return self._event_class._columns_to_arrow(self._columns(fields))
+
+    def group_by(self, fields, aggs=None):
+        """
+        Group the rows by one or several fields and compute aggregations directly on the columns. 
+        Count, sum and average are accelerated with NumPy if installed.  
+
+        See `msiempy.core.types.NitroList.group_by` for arguments.
+        """
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        fields, aggs = NitroList._parse_group_by(fields, aggs)
+        columns = self._columns(
+            fields + list(dict.fromkeys(a[2] for a in aggs if a[2] != None))
+        )
+        columns = EventDecoder(event_class=self._event_class)._decode_aggregated(
+            columns, fields, aggs
+        )
+        return NitroList(alist=NitroList._aggregate(fields, aggs, columns, numpy=numpy))
+
+    def to_events(self):
+        """
+        Returns a `EventManager` (or `GroupedEventManager`) of `Event` objects.
+        """
+        manager = (
+            GroupedEventManager
+            if issubclass(self._event_class, GroupedEvent)
+            else EventManager
+        )
+        return manager(alist=[row.to_dict() for row in self])
+
+
+class EventRow(collections.abc.Mapping):
+    """
+    Read-only dict-like view of a row of a `EventTable`. Supports `Event`-style `__getitem__` with nickname resolution.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key):
+        try:
+            column = self._table._find_column(key)
+        except KeyError:
+            raise KeyError("Dictionnary key not found : {}".format(key))
+        return self._table._data[column][self._index]
+
+    def __contains__(self, key):
+        try:
+            return self._table._find_column(key) != None
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        return iter(self._table.columns)
+
+    def __len__(self):
+        return len(self._table.columns)
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def to_dict(self):
+        """Returns a copy of the row as a `dict`."""
+        return {c: self._table._data[c][self._index] for c in self._table.columns}
+
+    def to_event(self):
+        """Returns a copy of the row as a `Event`."""
+        return self._table._event_class(adict=self.to_dict())
+
+    def get_id(self):
+        """Get the event ID or `None`."""
+        return self.get("Alert.IPSIDAlertID")
+
+
 class _QueryFilter(collections.UserDict):
     """Base class for all SIEM query objects in order to dump the filter as dict."""
 
+    def compile(self):
+        """
+        Compile the filter into a local predicate: `callable(item) -> bool`, 
+        to refine loaded results without querying the SIEM again. See `msiempy.core.types.NitroList.where`.
+
+        Operators are evaluated like the SIEM does: 
+            - ``IN`` and ``NOT_IN`` match exact values and IP addresses in CIDR ranges (ex: ``"10.0.0.0/8"``),
+            - ``EQUALS`` and ``DOES_NOT_EQUAL`` match exact values,
+            - numeric operators compare values as numbers,
+            - ``CONTAINS`` and ``DOES_NOT_CONTAIN`` are case insensitive,
+            - ``REGEX`` patterns are searched in values.
+
+        Only basic and compound values are supported, watchlist and variable values can't be evaluated locally.  
+        Items field names are resolved like `Event` keys.
+
+        Raises:
+            `ValueError` if the filter can't be evaluated locally.
+        """
+        return self._compile(self.data)
+
+    @classmethod
+    def _compile(cls, afilter):
+        """
+        Compile a SIEM formatted filter `dict` (``EsmFieldFilter`` or ``EsmFilterGroup``).
+        """
+        if afilter["type"] == "EsmFilterGroup":
+            predicates = [cls._compile(f) for f in afilter["filters"]]
+            if afilter.get("logic", "AND") == "OR":
+                return lambda item: any(p(item) for p in predicates)
+            return lambda item: all(p(item) for p in predicates)
+
+        if afilter["type"] != "EsmFieldFilter":
+            raise ValueError("Unknown filter type: {}".format(afilter["type"]))
+
+        name = afilter["field"]["name"]
+        operator = afilter["operator"]
+        values = cls._basic_values(afilter["values"])
+        match = cls._compile_operator(operator, values)
+        negate = operator in ["NOT_IN", "DOES_NOT_EQUAL", "DOES_NOT_CONTAIN", "NUMERIC_NOT_EQUALS"]
+
+        def predicate(item):
+            value = item.get(name)
+            if value == None or value == "":
+                return negate
+            return match(value) != negate
+
+        return predicate
+
+    @staticmethod
+    def _basic_values(values):
+        basic = list()
+        for value in values:
+            if value["type"] == "EsmBasicValue":
+                basic.append(str(value["value"]))
+            elif value["type"] == "EsmCompoundValue":
+                basic.extend(str(v) for v in value["values"])
+            else:
+                raise ValueError(
+                    "Filters with {} can't be evaluated locally".format(value["type"])
+                )
+        return basic
+
+    @classmethod
+    def _compile_operator(cls, operator, values):
+        """
+        Returns the matching function `callable(value) -> bool` of an operator, negative operators are not inverted.
+        """
+        if operator in ["IN", "NOT_IN"]:
+            exact = set()
+            networks = list()
+            for value in values:
+                try:
+                    network = ipaddress.ip_network(value, strict=False)
+                except ValueError:
+                    exact.add(value)
+                    continue
+                if "/" in value:
+                    networks.append(network)
+                else:
+                    exact.add(str(network.network_address))
+                    exact.add(value)
+            in_networks = cls._compile_networks(networks)
+            return lambda value: str(value) in exact or in_networks(value)
+
+        if operator in ["EQUALS", "DOES_NOT_EQUAL"]:
+            exact = set(values)
+            return lambda value: str(value) in exact
+
+        if operator in ["CONTAINS", "DOES_NOT_CONTAIN"]:
+            terms = [v.lower() for v in values]
+            return lambda value: any(t in str(value).lower() for t in terms)
+
+        if operator == "REGEX":
+            patterns = [re.compile(v) for v in values]
+            return lambda value: any(p.search(str(value)) for p in patterns)
+
+        compare = {
+            "NUMERIC_EQUALS": lambda a, b: a == b,
+            "NUMERIC_NOT_EQUALS": lambda a, b: a == b,
+            "GREATER_THAN": lambda a, b: a > b,
+            "LESS_THAN": lambda a, b: a < b,
+            "GREATER_OR_EQUALS_THAN": lambda a, b: a >= b,
+            "LESS_OR_EQUALS_THAN": lambda a, b: a <= b,
+        }.get(operator)
+        if compare == None:
+            raise ValueError("Unknown filter operator: {}".format(operator))
+        numbers = [float(v) for v in values]
+
+        def match(value):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                return False
+            return any(compare(value, n) for n in numbers)
+
+        return match
+
+    @staticmethod
+    def _compile_networks(networks):
+        """
+        Returns a function that checks if a value is an IP address in the networks. 
+        Networks are merged in sorted integer ranges, IP addresses are looked up with a binary search.
+        """
+        if not networks:
+            return lambda value: False
+        ranges = {4: [], 6: []}
+        for network in sorted(networks, key=lambda n: (n.version, int(n.network_address))):
+            start, end = int(network.network_address), int(network.broadcast_address)
+            merged = ranges[network.version]
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        starts = {version: [r[0] for r in merged] for version, merged in ranges.items()}
+        addresses = dict()
+
+        def in_networks(value):
+            try:
+                address = addresses[value]
+            except KeyError:
+                try:
+                    address = ipaddress.ip_address(str(value))
+                except ValueError:
+                    address = None
+                addresses[value] = address
+            except TypeError:
+                return False
+            if address == None:
+                return False
+            merged = ranges[address.version]
+            index = bisect.bisect_right(starts[address.version], int(address)) - 1
+            return index >= 0 and int(address) <= merged[index][1]
+
+        return in_networks
+
 
 class GroupFilter(_QueryFilter):
     """
@@ -79,10 +79,9 @@ class WatchlistManager(NitroList):
             Get the list of types with: `msiempy.watchlist.WatchlistManager.get_wl_types`
             Most common types are: ``"IPAddress"``, ``"Hash"``, ``"SHA1"``, ``"DSIDSigID"``, ``"Port"``, ``"MacAddress"``, ``"NormID"``, ``"AppID"``, ``"CommandID"``, ``"DomainID"``, ``"HostID"``, ``"ObjectID"``, ``"Filename"``, ``"File_Hash"``.
         """
-        for wl in self.data:
-            if wl.get("name") == name:
-                logging.error("Cannot add: {} watchlist already exists.".format(name))
-                return
+        if self.get_by("name", name):
+            logging.error("Cannot add: {} watchlist already exists.".format(name))
+            return
         self.nitro.request("add_watchlist", name=name, wl_type=wl_type)
         self.refresh()
 
@@ -0,0 +1,133 @@
+"""
+Offline micro-benchmarks of the event results processing. 
+Uses the local testing events scaled up to the number of rows.
+
+Usage example : ./benchmarks.py --rows 1000000 decoding getitem parsing
+"""
+
+import argparse
+import json
+import timeit
+import tracemalloc
+import copy
+from datetime import timedelta
+
+from msiempy.core.utils import convert_to_time_obj, parse_query_result
+from msiempy.event import Event, EventDecoder
+
+
+def get_testing_data(rows, data="./tests/local/test-events.json"):
+    events = json.load(open(data, "r"))
+    return [copy.copy(events[i % len(events)]) for i in range(rows)]
+
+
+def bench(name, func, number=1):
+    duration = timeit.timeit(func, number=number) / number
+    print("{:<40} {:>10.4f}s".format(name, duration))
+    return duration
+
+
+def decoding(rows):
+    """Decoding time values with dateutil vs EventDecoder"""
+    values = [e["Alert.LastTime"] for e in rows]
+    ref = bench("dateutil convert_to_time_obj", lambda: [convert_to_time_obj(v) for v in values])
+    new = bench("EventDecoder.decode_column", lambda: EventDecoder().decode_column("Alert.LastTime", values))
+    print("Speedup: x{:.1f}".format(ref / new))
+    # Worst case for the decoder: all values are distinct
+    start = convert_to_time_obj(values[0])
+    values = [(start + timedelta(seconds=i)).strftime("%m/%d/%Y %H:%M:%S") for i in range(len(rows))]
+    ref = bench("dateutil (distinct values)", lambda: [convert_to_time_obj(v) for v in values])
+    new = bench("EventDecoder (distinct values)", lambda: EventDecoder().decode_column("Alert.LastTime", values))
+    print("Speedup: x{:.1f}".format(ref / new))
+    bench("EventDecoder.decode_rows (all columns)", lambda: EventDecoder().decode_rows(copy.deepcopy(rows)))
+
+
+class LegacyEvent(Event):
+    """Key resolution before the resolution index: nickname map then loop on table prefixes"""
+
+    def _lookup_key(self, key):
+        if key in self.data:
+            return key
+        if key in self.SIEM_FIELDS_MAP_NICKNAME_TO_INTERNAL_NAME and self.SIEM_FIELDS_MAP_NICKNAME_TO_INTERNAL_NAME[key] in self.data:
+            return self.SIEM_FIELDS_MAP_NICKNAME_TO_INTERNAL_NAME[key]
+        for table in self.FIELDS_TABLES:
+            if table + "." + key in self.data:
+                return table + "." + key
+        return None
+
+
+def getitem(rows):
+    """Event field access by nickname and by name without table prefix"""
+    keys = ["SrcIP", "msg", "BIN(7)", "Alert.SrcIP"]
+    durations = dict()
+    for cls in (LegacyEvent, Event):
+        events = [cls(e) for e in rows]
+        durations[cls] = (
+            bench("{}.__getitem__".format(cls.__name__), lambda: [event[k] for event in events for k in keys]),
+            bench("{}.__contains__ (missing key)".format(cls.__name__), lambda: ["DstIP" in event for event in events]),
+        )
+    print("Speedup: x{:.1f} (getitem), x{:.1f} (missing key)".format(
+        *(ref / new for ref, new in zip(durations[LegacyEvent], durations[Event]))))
+
+
+def _legacy_parse_query_result(columns, rows):
+    # Parsing before the shared columns names
+    events = list()
+    for row in rows:
+        event = dict()
+        for i in range(len(columns)):
+            event.update({columns[i]["name"]: row["values"][i]})
+        events.append(event)
+    return events
+
+
+def _raw_result(rows):
+    # Copy the strings so values are not shared, like in the SIEM responses
+    columns = [{"name": name} for name in rows[0]]
+    return columns, [{"values": ["".join(list(str(e.get(c["name"])))) for c in columns]} for e in rows]
+
+
+def _memory(rows, intern):
+    # Size of the parsed events once the raw result is freed
+    tracemalloc.start()
+    columns, result = _raw_result(rows)
+    events = parse_query_result(columns, result, intern=intern)
+    del result
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size
+
+
+def parsing(rows):
+    """Parsing of the raw query results (use --rows 1000000 for a million rows)"""
+    columns, result = _raw_result(rows)
+    ref = bench("legacy parse_query_result", lambda: _legacy_parse_query_result(columns, result))
+    new = bench("parse_query_result", lambda: parse_query_result(columns, result))
+    print("Speedup: x{:.1f}".format(ref / new))
+    bench("parse_query_result (interned fields)", lambda: parse_query_result(columns, result, intern=Event.INTERNED_FIELDS))
+    bench("parse_query_result (interned all)", lambda: parse_query_result(columns, result, intern=True))
+    del result
+    print("Memory: {:.0f}MB, {:.0f}MB with interned fields, {:.0f}MB all interned".format(
+        *(_memory(rows, intern) / 2 ** 20 for intern in (None, Event.INTERNED_FIELDS, True))))
+
+
+BENCHMARKS = {"decoding": decoding, "getitem": getitem, "parsing": parsing}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline benchmarks of msiempy results processing.")
+    parser.add_argument("benchmarks", nargs="*", help="Benchmarks to run, all by default. Choices: {}".format(", ".join(BENCHMARKS)))
+    parser.add_argument("--rows", "-r", type=int, default=100000, help="Number of rows")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rows = get_testing_data(args.rows)
+    for name in args.benchmarks or BENCHMARKS:
+        print("## {}: {}".format(name, BENCHMARKS[name].__doc__))
+        BENCHMARKS[name](rows)
+
+
+if __name__ == "__main__":
+    main()
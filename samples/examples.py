@@ -128,7 +128,7 @@ def alarm_examples():
 
     print("Acknowledge alarms...")
 
-    [alarm.acknowledge() for alarm in alarms]
+    alarms.acknowledge()
     while any([alarm["acknowledgedDate"] in ["", None] for alarm in alarms]):
         time.sleep(1)
         [alarm.refresh() for alarm in alarms]
@@ -145,7 +145,7 @@ def alarm_examples():
     )
 
     print("Unacknowledge alarms...")
-    [alarm.unacknowledge() for alarm in alarms]
+    alarms.unacknowledge()
     while any([alarm["acknowledgedDate"] not in ["", None] for alarm in alarms]):
         time.sleep(1)
         [alarm.refresh() for alarm in alarms]
@@ -5,6 +5,8 @@ import pathlib
 
 # REQUIREMENTS
 REQUIREMENTS = [ 'requests', 'tqdm', 'PTable', 'python-dateutil', 'urllib3' ]
+# OPTIONAL REQUIREMENTS
+EXTRAS_REQUIREMENTS = { 'pandas': ['pandas'], 'arrow': ['pyarrow'] }
 
 # The directory containing this file
 HERE = pathlib.Path(__file__).parent
@@ -25,6 +27,7 @@ setup(
     version=about['__version__'],
     packages=find_packages(exclude='tests',),
     install_requires=REQUIREMENTS,
+    extras_require=EXTRAS_REQUIREMENTS,
     license=about['__license__'],
     long_description=README,
     long_description_content_type="text/markdown",
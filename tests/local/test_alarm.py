@@ -1,6 +1,7 @@
 import unittest
 import json
-from msiempy import Alarm, AlarmManager
+from unittest import mock
+from msiempy import Alarm, AlarmManager, NitroSession, NitroError
 
 def get_testing_data(data="./tests/local/test-alarms.json"):
     return json.load(open(data, "r"))
@@ -34,3 +35,37 @@ class T(unittest.TestCase):
         for r in res :
             self.assertTrue(alarms._alarm_match(r))
 
+    def test_bulk_acknowledge(self):
+        sent = list()
+
+        def api_request(method, data):
+            # Payloads are sent encoded
+            data = json.loads(data)
+            ids = data["triggeredIds"]
+            ids = ids["alarmIdList"] if isinstance(ids, dict) else [i["value"] for i in ids]
+            if 7 in ids:
+                raise NitroError("Alarm 7 not found")
+            sent.append((method, data))
+
+        alarms = AlarmManager([{"id": {"value": i}} for i in range(10)])
+        nitro = mock.Mock(
+            api_request=api_request, logged_in=True, api_v=2, PARAMS=NitroSession.PARAMS
+        )
+        with mock.patch.object(AlarmManager, "nitro", nitro):
+            failed = alarms.acknowledge(chunk_size=4, workers=2)
+            self.assertEqual([f[0] for f in failed], [[4, 5, 6, 7]])
+            self.assertEqual(
+                sorted(sent, key=lambda r: r[1]["triggeredIds"]["alarmIdList"]),
+                [
+                    ("alarmAcknowledgeTriggeredAlarm", {"triggeredIds": {"alarmIdList": [0, 1, 2, 3]}}),
+                    ("alarmAcknowledgeTriggeredAlarm", {"triggeredIds": {"alarmIdList": [8, 9]}}),
+                ],
+            )
+
+            sent.clear()
+            nitro.api_v = 1
+            self.assertEqual(alarms[:2].delete(), [])
+            self.assertEqual(
+                sent,
+                [("alarmDeleteTriggeredAlarm", {"triggeredIds": [{"value": 0}, {"value": 1}]})],
+            )
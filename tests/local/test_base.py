@@ -1,6 +1,14 @@
+import os
+import gzip
+import pickle
+import tempfile
+import threading
 import unittest
 import pytest
-from msiempy.core import NitroList
+from unittest import mock
+from datetime import datetime
+from msiempy import EventManager
+from msiempy.core import NitroList, NitroSession, session
 import csv
 import time
 import json
@@ -11,6 +19,11 @@ def get_testing_data(data="./tests/local/test-events.json"):
     return json.load(open(data, "r"))
 
 
+def event_summary(event):
+    # Module level to be picklable
+    return (os.getpid(), type(event).__name__, event["msg"], event["SrcIP"])
+
+
 class T(unittest.TestCase):
 
     manager = NitroList(alist=get_testing_data())
@@ -76,3 +89,228 @@ class T(unittest.TestCase):
 
         print("SPECIFIC FIELDS")
         print(manager.get_text(fields=["Rule.msg", "Alert.LastTime"]))
+
+    def test_dict(self):
+        from msiempy import Event
+
+        data = {"Alert.SrcIP": "10.0.0.1", "tags": ["a", "b"]}
+        event = Event(adict=data)
+        # The dict is wrapped, lists are wrapped when accessed
+        self.assertIs(event.data, data)
+        self.assertIsInstance(data["tags"], list)
+        self.assertIsInstance(event["tags"], NitroList)
+        self.assertIsInstance(data["tags"], NitroList)
+        self.assertEqual(dict(event)["Alert.SrcIP"], "10.0.0.1")
+        self.assertIs(event.nitro, Event().nitro)
+
+        # A session can be set on the objects, other attributes need slots
+        self.assertFalse(hasattr(event, "__dict__"))
+        with self.assertRaises(AttributeError):
+            event.comment = "checked"
+        session = mock.Mock()
+        event.nitro = session
+        self.assertIs(event.nitro, session)
+        self.assertIs(event.copy().nitro, session)
+        self.assertIsNot(Event().nitro, session)
+
+        class CommentedEvent(Event):
+            pass
+
+        commented = CommentedEvent(adict=data)
+        commented.comment = "checked"
+        self.assertEqual(commented.comment, "checked")
+        manager = EventManager()
+        manager.nitro = session
+        self.assertIs(manager.nitro, session)
+        self.assertIsNot(EventManager().nitro, session)
+
+        copy = event.copy()
+        copy["SrcIP"] = "10.0.0.2"
+        self.assertEqual(event["SrcIP"], "10.0.0.1")
+        self.assertEqual(len(copy), 2)
+
+    def test_export(self):
+        manager = NitroList(alist=get_testing_data())
+        manager[0]["Alert.LastTime"] = datetime(2020, 6, 7, 10)
+        folder = tempfile.mkdtemp()
+
+        self.assertEqual(manager.export(os.path.join(folder, "events.csv")), len(manager))
+        with open(os.path.join(folder, "events.csv"), newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), len(manager))
+        self.assertEqual(rows[1]["Rule.msg"], manager[1]["Rule.msg"])
+        self.assertEqual(
+            manager.get_text(format="csv", fields=["Rule.msg"]).splitlines()[1],
+            manager[0]["Rule.msg"],
+        )
+
+        manager.export(os.path.join(folder, "events.jsonl.gz"))
+        with gzip.open(os.path.join(folder, "events.jsonl.gz"), "rt") as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines[0]["Alert.LastTime"], "2020-06-07T10:00:00")
+        self.assertEqual(lines[1], dict(manager[1]))
+
+        with self.assertRaises(AttributeError):
+            manager.export(os.path.join(folder, "events.xml"))
+
+    def test_index(self):
+        manager = NitroList(alist=[{"id": i, "ip": "10.0.0.{}".format(i % 3)} for i in range(10)])
+        manager.create_index("ip").create_index("id", kind="sorted")
+        self.assertEqual([i["id"] for i in manager.get_by("ip", "10.0.0.1")], [1, 4, 7])
+        self.assertEqual([i["id"] for i in manager.get_range("id", 3, 5)], [3, 4, 5])
+        self.assertEqual(manager._index("ip").size, 10)
+
+        # Maintained on append and extend
+        manager.append({"id": 10, "ip": "10.0.0.1"})
+        manager += [{"id": -1, "ip": "10.0.0.9"}]
+        index = manager._get_indexes()["ip"]
+        self.assertTrue(index.is_valid(manager.data))
+        self.assertEqual([i["id"] for i in manager.get_by("ip", "10.0.0.1")], [1, 4, 7, 10])
+        self.assertEqual([i["id"] for i in manager.get_range("id", high=0)], [-1, 0])
+
+        # Rebuilt after other modifications
+        manager.remove(manager[1])
+        self.assertFalse(index.is_valid(manager.data))
+        self.assertEqual([i["id"] for i in manager.get_by("ip", "10.0.0.1")], [4, 7, 10])
+
+        # Slices inherit the index definitions
+        part = manager[:5]
+        self.assertEqual(sorted(part._get_indexes()), ["id", "ip"])
+        self.assertEqual([i["id"] for i in part.get_by("ip", "10.0.0.1")], [4])
+
+        # Same results without index
+        manager.drop_index("ip")
+        self.assertEqual([i["id"] for i in manager.get_by("ip", "10.0.0.1")], [4, 7, 10])
+        self.assertEqual([i["id"] for i in NitroList(manager.data).get_range("id", 3, 5)], [3, 4, 5])
+
+    def test_index_replaced_items(self):
+        manager = NitroList(alist=[{"id": i, "ip": "10.0.0.{}".format(i % 3)} for i in range(6)])
+        manager.create_index("ip")
+        self.assertEqual([i["id"] for i in manager.get_by("ip", "10.0.0.1")], [1, 4])
+        manager[0] = {"id": 10, "ip": "10.0.0.1"}
+        self.assertEqual([i["id"] for i in manager.get_by("ip", "10.0.0.1")], [10, 1, 4])
+
+        # In place edits of the items require a reindex
+        manager[1]["ip"] = "10.0.0.2"
+        self.assertEqual([i["id"] for i in manager.get_by("ip", "10.0.0.1")], [10, 1, 4])
+        manager.reindex()
+        self.assertEqual([i["id"] for i in manager.get_by("ip", "10.0.0.1")], [10, 4])
+
+    def test_search(self):
+        manager = NitroList(alist=get_testing_data())
+        expected = [item for item in manager if any("connect" in str(v) for v in item.values())]
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(list(manager.search("connect")), expected)
+        self.assertEqual(list(manager.search("connect", trigrams=True)), expected)
+        self.assertIsNone(manager.__dict__.get("_search"))
+        self.assertEqual(list(manager.search("connect", trigrams=True, cache=True)), expected)
+        self.assertIsNotNone(manager._search_index(sorted(manager.keys()), cache=True)._trigrams)
+        self.assertEqual(list(manager.search("connect", processes=2)), expected)
+        self.assertEqual(
+            len(manager.search("connect", invert=True, fields=["Rule.msg"]))
+            + len(manager.search("connect", fields=["Rule.msg"])),
+            len(manager),
+        )
+        # The cached values are rebuilt when the list changes
+        manager.append({"Rule.msg": "connect from somewhere"})
+        self.assertEqual(len(manager.search("connect", trigrams=True, cache=True)), len(expected) + 1)
+
+    def test_search_missing_keys(self):
+        # Keys missing from an item are searched as "None"
+        manager = NitroList(alist=[{"a": "x", "b": "y"}, {"a": "x"}])
+        self.assertEqual(list(manager.search("None")), [manager[1]])
+        self.assertEqual(list(manager.search("y", invert=True)), [manager[0], manager[1]])
+        self.assertEqual(list(manager.search("None", cache=True, trigrams=True)), [manager[1]])
+
+    def test_search_edited_items(self):
+        manager = NitroList(alist=get_testing_data())
+        manager.search("connect")
+        manager[0]["Rule.msg"] = "changed"
+        self.assertEqual(list(manager.search("changed", fields=["Rule.msg"])), [manager[0]])
+
+        # Cached values must be cleared after editing items
+        manager.search("changed", cache=True)
+        manager[1]["Rule.msg"] = "edited"
+        self.assertEqual(len(manager.search("edited", cache=True)), 0)
+        manager.clear_search_cache()
+        self.assertEqual(list(manager.search("edited", cache=True)), [manager[1]])
+
+    def test_perform(self):
+        manager = NitroList(alist=list(range(20)))
+
+        def square(i):
+            if i == 13:
+                raise ValueError("Unlucky")
+            time.sleep(0.02 if i == 7 else 0)
+            return (i * i, threading.current_thread().name)
+
+        results = manager.perform(square, asynch=True, workers=4, return_exceptions=True, chunksize=3)
+        self.assertEqual([r[0] for r in results if not isinstance(r, Exception)], [i * i for i in range(20) if i != 13])
+        self.assertIsInstance(results[13], ValueError)
+        self.assertTrue(results[0][1].startswith(NitroSession.EXECUTOR_THREAD_PREFIX))
+        self.assertEqual(manager.slowest(1)[0][1], 7)
+
+        # The first exception is raised
+        with self.assertRaises(ValueError):
+            manager.perform(square, asynch=True, workers=4)
+
+        # Streaming
+        streamed = dict(manager.perform(lambda i: i * 2, data=list(range(10)), asynch=True, workers=3, as_completed=True))
+        self.assertEqual(streamed, {i: i * 2 for i in range(10)})
+
+    def test_perform_nested(self):
+        # Nested asynchronous calls share the executor threads without deadlock,
+        # with more nesting levels than threads
+        nitro = NitroSession()
+        nitro.shutdown()
+        threads = set()
+        results = list()
+
+        def leaf(j):
+            threads.add(threading.current_thread().name)
+            time.sleep(0.001)
+            return j
+
+        def level(i, depth):
+            if depth == 0:
+                return leaf(i)
+            return sum(NitroList(alist=list(range(3))).perform(level, asynch=True, workers=3, func_args=dict(depth=depth - 1)))
+
+        def run():
+            results.extend(NitroList(alist=list(range(5))).perform(level, asynch=True, workers=3, func_args=dict(depth=4)))
+
+        with mock.patch.object(NitroSession, "MAX_WORKERS", 2):
+            runner = threading.Thread(target=run, daemon=True)
+            runner.start()
+            runner.join(timeout=30)
+            self.assertFalse(runner.is_alive(), "Nested perform calls deadlocked")
+            nitro.shutdown()
+        self.assertEqual(results, [81] * 5)
+        self.assertTrue(all(t.startswith(NitroSession.EXECUTOR_THREAD_PREFIX) for t in threads))
+        self.assertLessEqual(len(threads), 2)
+
+    def test_perform_process(self):
+        events = EventManager(get_testing_data()[:50])
+        copied = pickle.loads(pickle.dumps(events[0]))
+        self.assertEqual(type(copied).__name__, "Event")
+        self.assertEqual(copied["msg"], events[0]["msg"])
+
+        results = events.perform(event_summary, asynch=True, workers=2, executor="process")
+        self.assertEqual([r[2:] for r in results], [(e["msg"], e["SrcIP"]) for e in events])
+        self.assertEqual(set(r[1] for r in results), {"Event"})
+        self.assertNotIn(os.getpid(), set(r[0] for r in results))
+        self.assertEqual(len(events.perform_times), 50)
+
+        with self.assertRaises(ValueError):
+            events.perform(event_summary, executor="greenlet")
+
+        # The session is re-initiated after fork, keeping the authentication headers
+        nitro = NitroSession()
+        nitro.session.headers["X-Xsrf-Token"] = "token"
+        old, executor = nitro.session, nitro.executor()
+        session._reinit_after_fork()
+        executor.shutdown()
+        self.assertIsNot(nitro.session, old)
+        self.assertEqual(nitro.session.headers["X-Xsrf-Token"], "token")
+        self.assertIsNone(nitro._executor)
+        del nitro.session.headers["X-Xsrf-Token"]
@@ -0,0 +1,133 @@
+import os
+import unittest
+import tempfile
+import json
+from unittest import mock
+from datetime import datetime, timedelta
+from msiempy import EventManager, Event
+from msiempy.core import QueryCache, DetailCache, NitroError
+
+
+def get_testing_data(data="./tests/local/test-events.json"):
+    return json.load(open(data, "r"))
+
+
+class T(unittest.TestCase):
+    def test_divide(self):
+        cache = QueryCache(path=tempfile.mkdtemp(), segment="1h")
+        segments = cache.divide(
+            datetime(2020, 6, 7, 10, 30), datetime(2020, 6, 7, 13, 0)
+        )
+        self.assertEqual(
+            [(s[0].hour, s[0].minute, s[2]) for s in segments],
+            [(10, 30, False), (11, 0, True), (12, 0, True)],
+        )
+        # Open segments are never cacheable
+        now = datetime.now()
+        segments = cache.divide(now - timedelta(hours=3), now)
+        self.assertFalse(segments[-1][2])
+
+    def test_put_get_evict(self):
+        cache = QueryCache(path=tempfile.mkdtemp(), segment="1h", max_size=10 ** 6)
+        fp = QueryCache.fingerprint(["Rule.msg", "SrcIP"], [], ("DESCENDING", "LastTime"))
+        self.assertEqual(
+            fp,
+            QueryCache.fingerprint(["SrcIP", "Rule.msg"], [], ("DESCENDING", "LastTime")),
+        )
+        rows = get_testing_data()
+        seg = datetime(2020, 6, 7, 17)
+        self.assertIsNone(cache.get(fp, seg))
+        cache.put(fp, seg, seg + timedelta(hours=1), rows)
+        self.assertEqual(cache.get(fp, seg), rows)
+        self.assertEqual(cache.stats, {"hits": 1, "misses": 1})
+
+        # Open segment is not stored
+        now = datetime.now()
+        cache.put(fp, now, now + timedelta(hours=1), rows)
+        self.assertIsNone(cache.get(fp, now))
+
+        cache.max_size = 0
+        cache.evict()
+        self.assertEqual(cache.size(), 0)
+
+    def test_load_data_cached(self):
+        queries = list()
+
+        def load(self, **kwargs):
+            queries.append(self._start_time)
+            return ([{"Alert.LastTime": str(self._start_time), "Alert.SrcIP": "10.0.0.1"}], True)
+
+        cache = QueryCache(path=tempfile.mkdtemp(), segment="1h")
+        query = dict(
+            time_range="CUSTOM",
+            start_time=datetime(2020, 6, 7, 10).isoformat(),
+            end_time=datetime(2020, 6, 7, 13).isoformat(),
+        )
+        with mock.patch.object(EventManager, "_qry_load_data", load):
+            events = EventManager(**query).load_data(cache=cache)
+            self.assertEqual(len(queries), 3)
+            self.assertEqual(events[0]["LastTime"], str(datetime(2020, 6, 7, 12)))
+            EventManager(**query).load_data(cache=cache)
+            self.assertEqual(len(queries), 3)
+
+            # Not ordered by time: the cache is bypassed
+            EventManager(order=("ASCENDING", "SrcIP"), **query).load_data(cache=cache)
+            self.assertEqual(len(queries), 4)
+
+    def test_detail_cache(self):
+        path = os.path.join(tempfile.mkdtemp(), "details.sqlite")
+        cache = DetailCache(max_size=2, path=path)
+        self.assertIsNone(cache.hit_rate)
+        self.assertIsNone(cache.get("1|1"))
+        cache.put("1|1", {"msg": "one"})
+        cache.put("1|2", {"msg": "two"})
+        cache.put("1|3", {"msg": "three"})
+        # Least recently used entry evicted from memory but still on disk
+        self.assertNotIn("1|1", cache._memory)
+        self.assertEqual(cache.get("1|1"), {"msg": "one"})
+        self.assertEqual(cache.hit_rate, 0.5)
+        # Persisted across instances
+        self.assertEqual(DetailCache(path=path).get("1|3"), {"msg": "three"})
+        # Expired entries are ignored
+        self.assertIsNone(DetailCache(path=path, ttl=timedelta(0)).get("1|3"))
+        # Removed in memory and on disk
+        cache.pop("1|3")
+        self.assertIsNone(cache.get("1|3"))
+        self.assertIsNone(DetailCache(path=path).get("1|3"))
+
+    def test_get_details(self):
+        requested = list()
+
+        def request(name, id):
+            requested.append(id)
+            if id == "1|4":
+                raise NitroError("Not found")
+            return {"Alert.IPSIDAlertID": id, "Rule.msg": "msg " + id}
+
+        cache = DetailCache()
+        nitro = mock.Mock(request=request)
+        with mock.patch.object(EventManager, "nitro", nitro):
+            details = EventManager.get_details(
+                ["1|1", "1|2", "1|1", None, "1|4"], cache=cache
+            )
+            self.assertEqual(sorted(details), ["1|1", "1|2"])
+            self.assertEqual(sorted(requested), ["1|1", "1|2", "1|4"])
+            details = EventManager.get_details(["1|2", "1|3"], cache=cache)
+            self.assertEqual(details["1|3"]["Rule.msg"], "msg 1|3")
+            self.assertEqual(sorted(requested), ["1|1", "1|2", "1|3", "1|4"])
+
+    def test_set_note_drops_details(self):
+        cache = DetailCache()
+        for i in range(3):
+            cache.put("1|{}".format(i), {"Rule.msg": "msg"})
+        events = EventManager([{"Alert.IPSIDAlertID": "1|{}".format(i)} for i in range(2)])
+        nitro = mock.Mock(logged_in=True)
+        with mock.patch.object(EventManager, "DETAILS_CACHE", cache), mock.patch.object(
+            Event, "nitro", nitro
+        ), mock.patch.object(EventManager, "nitro", nitro):
+            events[0].set_note("note")
+            self.assertIsNone(cache.get("1|0"))
+            self.assertIsNotNone(cache.get("1|1"))
+            events.set_notes("note", workers=2)
+        self.assertIsNone(cache.get("1|1"))
+        self.assertIsNotNone(cache.get("1|2"))
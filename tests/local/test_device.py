@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+from msiempy import DevTree, NitroSession, GroupedEventManager
+
+
+def devtree_row(desc_id, name, ds_id, client_groups="0"):
+    row = [desc_id, name, ds_id] + ["T"] * 26 + [client_groups]
+    row[16] = "65"
+    row[27] = "10.0.0.1"
+    row[28] = name
+    return ",".join(row)
+
+
+class T(unittest.TestCase):
+    def test_get_ds_ids(self):
+        items = "\n".join(
+            [
+                devtree_row("14", "ESM", "144115188075855872"),
+                devtree_row("2", "ERC", "144117387099111424"),
+                devtree_row("3", "app", "144117387182997504"),
+                devtree_row("254", "group", "1"),
+            ]
+        )
+        nitro = NitroSession()
+        with mock.patch.object(nitro, "request", return_value={"ITEMS": items}) as request:
+            nitro.cache.clear()
+            expected = ["144115188075855872", "144117387099111424", "144117387182997504"]
+            self.assertEqual(DevTree.get_ds_ids(), expected)
+            self.assertEqual(DevTree.get_ds_ids(), expected)
+            # One device tree call, cached
+            request.assert_called_once_with("get_devtree")
+
+    def test_all_ipsids_filter(self):
+        # A client container, its clients share its IPSID and are not listed
+        items = "\n".join(
+            [
+                devtree_row("2", "ERC", "144117387099111424"),
+                devtree_row("3", "clients", "144117387182997504", client_groups="1"),
+            ]
+        )
+        nitro = NitroSession()
+        with mock.patch.object(nitro, "request", return_value={"ITEMS": items}) as request:
+            nitro.cache.clear()
+            query = GroupedEventManager(field="SrcIP")
+            query.clear_filters()
+            self.assertEqual(
+                query.filters[0]["values"][0]["values"],
+                ["144117387099111424", "144117387182997504"],
+            )
+            request.assert_called_once_with("get_devtree")
+
+    def test_search(self):
+        tree = DevTree.__new__(DevTree)
+        tree.data = [
+            {"ds_ip": "10.0.0.{}".format(i), "name": "DS{}".format(i), "hostname": "host{}".format(i),
+             "ds_id": str(i), "zone_id": "0" if i != 3 else "7", "type_id": str(i % 2)}
+            for i in range(5)
+        ]
+        self.assertEqual(tree.search("ds2")["ds_id"], "2")
+        self.assertEqual(tree.search("HOST4")["ds_id"], "4")
+        self.assertIsNone(tree.search("DS3"))
+        self.assertEqual(tree.search("DS3", zone_id="7")["ds_id"], "3")
+        self.assertEqual([ds["ds_id"] for ds in tree.search_ds_group("type_id", "1")], ["1", "3"])
+        # The index is rebuilt when the tree changes
+        tree.data = tree.data[:2]
+        self.assertIsNone(tree.search("ds2"))
@@ -0,0 +1,44 @@
+import unittest
+import json
+from msiempy import EventManager, FieldFilter, GroupFilter
+
+
+def get_testing_data(data="./tests/local/test-events.json"):
+    return json.load(open(data, "r"))
+
+
+class T(unittest.TestCase):
+
+    events = EventManager(alist=get_testing_data())
+
+    def test_where_cidr(self):
+        matching = self.events.where([("SrcIP", ["22.0.0.0/8", "5.190.142.30"])])
+        expected = [
+            e for e in self.events
+            if e["SrcIP"].startswith("22.") or e["SrcIP"] == "5.190.142.30"
+        ]
+        self.assertIsInstance(matching, EventManager)
+        self.assertEqual(list(matching), expected)
+
+        not_in = self.events.where(FieldFilter("SrcIP", ["22.0.0.0/8"], operator="NOT_IN"))
+        self.assertEqual(len(not_in), len([e for e in self.events if not e["SrcIP"].startswith("22.")]))
+
+    def test_where_operators(self):
+        greater = self.events.where(FieldFilter("EventCount", ["10"], operator="GREATER_THAN"))
+        self.assertEqual(len(greater), len([e for e in self.events if int(e["EventCount"]) > 10]))
+
+        contains = FieldFilter("msg", ["POSTFIX"], operator="CONTAINS")
+        regex = FieldFilter("msg", ["^Postfix (Lost|Disconnect)"], operator="REGEX")
+        self.assertEqual(
+            len(self.events.where([contains, regex])),
+            len([e for e in self.events if e["msg"].startswith(("Postfix Lost", "Postfix Disconnect"))]),
+        )
+
+        group = GroupFilter([contains, FieldFilter("SrcIP", ["22.0.0.0/8"])], logic="OR")
+        self.assertEqual(
+            len(self.events.where(group)),
+            len([e for e in self.events if "postfix" in e["msg"].lower() or e["SrcIP"].startswith("22.")]),
+        )
+
+        with self.assertRaises(ValueError):
+            self.events.where(FieldFilter("SrcIP", [{"type": "EsmWatchlistValue", "watchlist": 42}]))
@@ -111,3 +111,24 @@ class T(unittest.TestCase):
                 ]
             ),
         )
+
+    def test_key_index(self):
+        first = Event(adict=dict(T.TEST_EVENTS[0], **{"Rule.msg": "unknown event"}))
+        second = Event(adict=dict(first.data, **{"Alert.DstIP": "139.55.124.9"}))
+        self.assertEqual(first["SrcIP"], "22.22.24.22")
+        self.assertEqual(first["msg"], "unknown event")
+        self.assertEqual(second["DstIP"], "139.55.124.9")
+        self.assertNotIn("HostID", first)
+        with self.assertRaises(KeyError):
+            first["HostID"]
+        # The resolution index is shared by events with the same keys
+        self.assertIs(first._key_index, second._key_index)
+
+        # The index is rebuilt when the keys change
+        first["Alert.HostID"] = "host"
+        self.assertEqual(first["HostID"], "host")
+        del first.data["Alert.SrcIP"]
+        first.data["SrcIP"] = "1.1.1.1"
+        self.assertEqual(first["SrcIP"], "1.1.1.1")
+        del first["HostID"]
+        self.assertNotIn("HostID", first)
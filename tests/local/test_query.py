@@ -0,0 +1,220 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest import mock
+from datetime import datetime, timedelta
+from msiempy import EventManager, GroupedEventManager, NitroError
+
+
+class T(unittest.TestCase):
+    def test_adaptive_polling(self):
+        events = EventManager(
+            time_range="CUSTOM",
+            start_time=datetime(2020, 6, 7, 0, 0),
+            end_time=datetime(2020, 6, 7, 1, 0),
+        )
+        statuses = iter([{"complete": False}] * 3 + [{"complete": True}] * 2)
+        sleeps = list()
+
+        with mock.patch.dict(EventManager._completion_times, clear=True), mock.patch.object(
+            events.nitro, "request", side_effect=lambda *a, **k: next(statuses)
+        ), mock.patch("time.sleep", sleeps.append):
+            self.assertTrue(events._wait_for(1, 10))
+
+            self.assertEqual(events.query_stats["queries"], 1)
+            self.assertEqual(events.query_stats["polls"], 4)
+            self.assertEqual(sleeps, [0.02, 0.04, 0.08, 0.16])
+            # Last incomplete poll plus half of the last sleep, not the whole wait time
+            learned = EventManager._completion_times[events._query_shape()]
+            self.assertAlmostEqual(learned, 0.08, delta=0.05)
+
+            # The learned time is slept before the first poll, up to _POLL_FIRST_MAX_SLEEP
+            EventManager._completion_times[events._query_shape()] = 30
+            self.assertTrue(events._wait_for(1, 10))
+            self.assertEqual(sleeps[-1], EventManager._POLL_FIRST_MAX_SLEEP)
+            self.assertLess(EventManager._completion_times[events._query_shape()], 30)
+        self.assertEqual(EventManager._completion_times, {})
+
+    def test_follow(self):
+        polls = iter(
+            [
+                [
+                    {"Rule.msg": "a", "Alert.LastTime": "06/07/2020 17:14:21", "Alert.IPSIDAlertID": "1|1"},
+                    {"Rule.msg": "b", "Alert.LastTime": "06/07/2020 17:14:22", "Alert.IPSIDAlertID": "1|2"},
+                ],
+                [
+                    {"Rule.msg": "b", "Alert.LastTime": "06/07/2020 17:14:22", "Alert.IPSIDAlertID": "1|2"},
+                    {"Rule.msg": "c", "Alert.LastTime": "06/07/2020 17:15:00", "Alert.IPSIDAlertID": "1|3"},
+                ],
+            ]
+        )
+        state_file = os.path.join(tempfile.mkdtemp(), "follow.json")
+
+        with mock.patch.object(
+            EventManager, "_qry_load_data", lambda self, **k: (next(polls), True)
+        ):
+            events = list(
+                EventManager(
+                    start_time=datetime(2020, 6, 7, 17), end_time=datetime(2020, 6, 8)
+                ).follow(interval=0, max_polls=2, state_file=state_file)
+            )
+
+        self.assertEqual([e["Rule.msg"] for e in events], ["a", "b", "c"])
+        with open(state_file) as f:
+            state = json.load(f)
+        self.assertEqual(state["watermark"], "2020-06-07T17:15:00")
+        self.assertEqual(state["seen"], ["1|1", "1|2", "1|3"])
+
+    def test_histogram(self):
+        def load(self, **kwargs):
+            # One group of 2 events per hour + one group the 3rd hour
+            rows = [{"Alert.DSIDSigID": "1-1", "COUNT(*)": "2", "SUM(Alert.EventCount)": "5"}]
+            if self._start_time.hour == 2:
+                rows.append({"Alert.DSIDSigID": "1-2", "COUNT(*)": "1", "SUM(Alert.EventCount)": "1"})
+            return (rows, True)
+
+        ipsid_filter = {"type": "EsmFieldFilter", "field": {"name": "IPSID"}, "operator": "IN", "values": []}
+        with mock.patch.object(GroupedEventManager, "_qry_load_data", load), mock.patch.object(
+            GroupedEventManager, "_all_ipsids_filter", staticmethod(lambda: ipsid_filter)
+        ):
+            hist = GroupedEventManager(
+                field="DSIDSigID", start_time=datetime(2020, 6, 7), end_time=datetime(2020, 6, 7, 3, 30)
+            ).histogram(bucket="1h", workers=2)
+
+        self.assertEqual(len(hist["buckets"]), 4)
+        self.assertEqual(hist["buckets"][-1], datetime(2020, 6, 7, 3))
+        self.assertEqual(hist["series"], {"1-1": [2, 2, 2, 2], "1-2": [0, 0, 1, 0]})
+
+    def test_from_ids(self):
+        queries = list()
+
+        def load(self, **kwargs):
+            ids = [v["value"] for v in self.filters[0]["values"]]
+            queries.append((ids, self._start_time, self._end_time))
+            # The SIEM doesn't know the event 1|4
+            return ([{"Alert.IPSIDAlertID": i, "Rule.msg": "msg " + i} for i in ids if i != "1|4"], True)
+
+        ids = ["1|1", "1|2", "1|3", "1|4", "1|5", "1|1"]
+        hints = {"1|2": datetime(2020, 6, 7, 12), "1|3": "06/07/2020 10:00:00"}
+        with mock.patch.object(EventManager, "_qry_load_data", load):
+            events = EventManager.from_ids(ids, hints=hints, margin="1h", chunk_size=2, workers=2)
+
+        self.assertEqual([e["IPSIDAlertID"] for e in events], ["1|1", "1|2", "1|3", "1|5"])
+        self.assertEqual(events[1]["msg"], "msg 1|2")
+        self.assertEqual(len(queries), 3)
+        # Hinted IDs are queried together, in the hints time window
+        hinted = [q for q in queries if q[0] == ["1|3", "1|2"]][0]
+        self.assertEqual(hinted[1:], (datetime(2020, 6, 7, 9), datetime(2020, 6, 7, 13)))
+
+    def test_from_ids_complete(self):
+        def load(self, **kwargs):
+            ids = [v["value"] for v in self.filters[0]["values"]]
+            rows = [{"Alert.IPSIDAlertID": i} for i in ids]
+            # Same completion check as the SIEM query
+            return (rows, len(rows) < self.limit)
+
+        ids = ["1|{}".format(i) for i in range(6)]
+        with mock.patch.object(EventManager, "_qry_load_data", load), self.assertLogs(
+            "msiempy", level="DEBUG"
+        ) as logs:
+            events = EventManager.from_ids(ids, chunk_size=2, workers=3)
+
+        self.assertEqual(len(events), 6)
+        self.assertFalse([line for line in logs.output if "not complete" in line])
+
+    def test_set_notes(self):
+        sent = list()
+
+        def api_request(method, data, **kwargs):
+            if data["AID"] == "1|2":
+                raise NitroError("Invalid event")
+            sent.append((method, data))
+
+        events = EventManager([{"Alert.IPSIDAlertID": "1|{}".format(i), "Rule.msg": str(i)} for i in range(5)])
+        progress = list()
+        nitro = mock.Mock(api_request=api_request, logged_in=True)
+        with mock.patch.object(EventManager, "nitro", nitro):
+            failed = events.set_notes(
+                lambda e: None if e["msg"] == "4" else 'Note "{}"\n'.format(e["msg"]),
+                no_date=True,
+                workers=2,
+                rate=1000,
+                callback=lambda done, total: progress.append((done, total)),
+            )
+        self.assertEqual(list(failed), ["1|2"])
+        self.assertEqual(sorted(d["NOTE"] for _, d in sent), ['Note "0"\n', 'Note "1"\n', 'Note "3"\n'])
+        self.assertEqual(set(m for m, _ in sent), {"IPS_ADDALERTNOTE"})
+        self.assertEqual(progress[-1], (4, 4))
+
+    def test_load_data_sharded(self):
+        shards = EventManager._ipsids_shards(
+            {"1": 2000, "2": 300, "3": 250, "4": 100, "5": 0}, 400, 200
+        )
+        self.assertEqual(shards, [(["1"], 2000), (["2", "4", "5"], 400), (["3"], 250)])
+
+        queries = list()
+
+        def load(self, **kwargs):
+            ipsids = self.filters[-1]["values"][0]["values"]
+            queries.append((ipsids, self._start_time, self._end_time))
+            return ([{"Alert.IPSID": i, "Rule.msg": "msg"} for i in ipsids], True)
+
+        volumes = lambda ipsids, filters, start, end: {"1": 2000, "2": 300, "3": 50}
+        with mock.patch.object(EventManager, "_qry_load_data", load), mock.patch.object(
+            EventManager, "_ipsids_volumes", staticmethod(volumes)
+        ):
+            events = EventManager(
+                time_range="CUSTOM",
+                start_time=datetime(2020, 6, 7, 10).isoformat(),
+                end_time=datetime(2020, 6, 7, 12).isoformat(),
+                filters=[("IPSID", ["1", "2", "3"]), ("SrcIP", "10.0.0.0/8")],
+                limit=500,
+            ).load_data(shard_by="ipsid", workers=2)
+
+        # 2000 events of the IPSID 1 are split in 5 time slices, 2 and 3 are queried together
+        self.assertEqual(len(queries), 6)
+        self.assertEqual(sorted(len(q[0]) for q in queries), [1, 1, 1, 1, 1, 2])
+        self.assertEqual(min(q[1] for q in queries), datetime(2020, 6, 7, 10))
+        self.assertEqual(len(events), 7)
+
+    def test_load_data_spill(self):
+        def load(self, **kwargs):
+            if self._parent == None:
+                # The root query is not completed
+                return ([{"Rule.msg": "root"}] * self.limit, False)
+            return (
+                [{"Alert.IPSIDAlertID": "{}|{}".format(self._start_time.hour, i)} for i in range(4)],
+                True,
+            )
+
+        path = os.path.join(tempfile.mkdtemp(), "spill.sqlite")
+        with mock.patch.object(EventManager, "_qry_load_data", load):
+            events = EventManager(
+                time_range="CUSTOM",
+                start_time=datetime(2020, 6, 7, 10).isoformat(),
+                end_time=datetime(2020, 6, 7, 13).isoformat(),
+                limit=10,
+            ).load_data(max_query_depth=1, slots=3, workers=3, spill=path, spill_cache=1)
+
+        self.assertEqual(type(events.data).__name__, "SpilledList")
+        events.data.page_size = 3
+        self.assertEqual(len(events), 12)
+        # Spilled in the order of the time slots
+        self.assertEqual(
+            [e["IPSIDAlertID"] for e in events][:6], ["10|0", "10|1", "10|2", "10|3", "11|0", "11|1"]
+        )
+        self.assertEqual(events[-1]["IPSIDAlertID"], "12|3")
+        self.assertEqual([e["IPSIDAlertID"] for e in events.data[4:6]], ["11|0", "11|1"])
+        self.assertEqual(len(events.data._pages), 1)
+        self.assertTrue(os.path.exists(path))
+
+        # The same manager can be reloaded with or without spill
+        with mock.patch.object(EventManager, "_qry_load_data", load):
+            events.load_data(max_query_depth=1, slots=3, workers=3)
+            self.assertIsNone(events._spill)
+            self.assertIsInstance(events.data, list)
+            self.assertEqual(len(events), 12)
+            events.load_data(max_query_depth=1, slots=3, workers=3, spill=True)
+        self.assertNotEqual(events.data.store.path, path)
+        self.assertEqual(len(events), 12)
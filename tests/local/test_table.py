@@ -0,0 +1,133 @@
+import unittest
+import importlib.util
+import json
+import ipaddress
+from datetime import datetime
+from msiempy import EventTable, EventManager, NitroList
+from msiempy.event import EventDecoder
+
+
+def get_testing_data(data="./tests/local/test-events.json"):
+    return json.load(open(data, "r"))
+
+
+class T(unittest.TestCase):
+    def test_table(self):
+        data = get_testing_data()
+        table = EventTable.from_dicts(data)
+
+        self.assertEqual(len(table), len(data))
+        for row, item in zip(table, data):
+            self.assertEqual(dict(row), item)
+            self.assertEqual(row["SrcIP"], item["Alert.SrcIP"])
+            self.assertIn("IPSIDAlertID", row)
+            self.assertNotIn("DstIP", row)
+
+        self.assertEqual(table.column("LastTime"), [e["Alert.LastTime"] for e in data])
+        self.assertEqual(len(table[10:20]), 10)
+        self.assertEqual(dict(table[-1]), data[-1])
+
+        merged = EventTable.concat([table, EventTable.from_dicts([{"Alert.DstIP": "::"}])])
+        self.assertEqual(len(merged), len(data) + 1)
+        self.assertIsNone(merged[0]["DstIP"])
+        self.assertEqual(merged[-1]["DstIP"], "::")
+
+        events = table.to_events()
+        self.assertIsInstance(events, EventManager)
+        self.assertEqual(events[0]["SrcIP"], table[0]["SrcIP"])
+
+    @unittest.skipUnless(importlib.util.find_spec("pandas"), "pandas is not installed")
+    def test_to_dataframe(self):
+        data = get_testing_data()
+        for frame in [EventManager(alist=data).to_dataframe(), EventTable.from_dicts(data).to_dataframe()]:
+            self.assertEqual(len(frame), len(data))
+            self.assertEqual(str(frame["Alert.LastTime"].dtype)[:10], "datetime64")
+            self.assertEqual(str(frame["Alert.EventCount"].dtype), "Int64")
+            self.assertEqual(frame["Alert.EventCount"][0], int(data[0]["Alert.EventCount"]))
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_to_arrow(self):
+        data = get_testing_data()
+        table = EventTable.from_dicts(data).to_arrow()
+        self.assertEqual(table.num_rows, len(data))
+        self.assertEqual(str(table.schema.field("Alert.EventCount").type), "int64")
+        self.assertEqual(str(table.schema.field("Alert.LastTime").type), "timestamp[s]")
+
+    def test_decoder(self):
+        data = get_testing_data()
+        decoder = EventDecoder(tz="Etc/UTC")
+        table = decoder.decode_table(EventTable.from_dicts(data))
+        rows = decoder.decode_rows([dict(e) for e in data])
+        for row, decoded, item in zip(table, rows, data):
+            self.assertEqual(dict(row), decoded)
+            self.assertEqual(row["EventCount"], int(item["Alert.EventCount"]))
+            self.assertEqual(row["SrcIP"], ipaddress.ip_address(item["Alert.SrcIP"]))
+            self.assertEqual(
+                row["LastTime"],
+                datetime.strptime(item["Alert.LastTime"], "%m/%d/%Y %H:%M:%S").replace(
+                    tzinfo=decoder.tz
+                ),
+            )
+            self.assertEqual(row["Rule.msg"], item["Rule.msg"])
+        # Undecodable values are left as is
+        self.assertEqual(decoder.decode_column("Alert.EventCount", ["", None]), ["", None])
+
+    def test_group_by(self):
+        data = get_testing_data()
+        aggs = {
+            "count": "count",
+            "events": ("sum", "EventCount"),
+            "last": ("max", "LastTime"),
+            "ips": ("distinct", "SrcIP"),
+            "top": ("top", "SrcIP", 1),
+            "median": ("percentile", "EventCount", 50),
+        }
+        groups = EventManager(alist=data).group_by("msg", aggs)
+        self.assertEqual(sum(g["count"] for g in groups), len(data))
+        self.assertEqual(len(groups), len(set(e["Rule.msg"] for e in data)))
+
+        for group in groups:
+            items = [e for e in data if e["Rule.msg"] == group["msg"]]
+            self.assertEqual(group["count"], len(items))
+            self.assertEqual(group["events"], sum(int(e["Alert.EventCount"]) for e in items))
+            self.assertEqual(
+                group["last"],
+                max(datetime.strptime(e["Alert.LastTime"], "%m/%d/%Y %H:%M:%S") for e in items),
+            )
+            self.assertEqual(group["ips"], len(set(e["Alert.SrcIP"] for e in items)))
+            self.assertEqual(len(group["top"]), 1)
+
+        # Same results with the columnar container
+        self.assertEqual(list(EventTable.from_dicts(data).group_by(["msg"], aggs)), list(groups))
+
+        with self.assertRaises(ValueError):
+            EventManager(alist=data).group_by("msg", {"x": ("median", "EventCount")})
+
+    def test_group_by_empty_values(self):
+        data = get_testing_data()[:4]
+        for item in data[:2]:
+            item["Alert.LastTime"] = ""
+        for item, count in zip(data, ["9", "10", "", "2"]):
+            item["Alert.EventCount"] = count
+            item["Rule.msg"] = "msg"
+        aggs = {
+            "last": ("max", "LastTime"),
+            "max": ("max", "EventCount"),
+            "min": ("min", "EventCount"),
+            "median": ("percentile", "EventCount", 50),
+            "distinct": ("distinct", "EventCount"),
+            "top": ("top", "EventCount", 1),
+        }
+        group = EventManager(alist=data).group_by("msg", aggs)[0]
+        self.assertEqual(
+            group["last"],
+            max(datetime.strptime(e["Alert.LastTime"], "%m/%d/%Y %H:%M:%S") for e in data[2:]),
+        )
+        self.assertEqual((group["max"], group["min"], group["median"]), (10, 2, 9))
+        self.assertEqual(group["distinct"], 3)
+        self.assertEqual(len(group["top"]), 1)
+
+        # Multi-digit counts are compared as numbers without decoding
+        rows = NitroList([{"count": c} for c in ["9", "10", "", None, "2"]])
+        group = rows.group_by([], {"max": ("max", "count"), "median": ("percentile", "count", 50)})[0]
+        self.assertEqual((group["max"], group["median"]), (10, 9))